@@ -3,49 +3,73 @@ import traceback
 import adsk.core
 import adsk.fusion
 
+from .Fusion360Utilities import start_app_object_events, stop_app_object_events
+
 handlers = []
 
 
-# Returns a dictionary for all inputs. Very useful for creating quick Fusion 360 Add-ins
-def get_inputs(command_inputs):
-    value_types = [adsk.core.BoolValueCommandInput.classType(), adsk.core.DistanceValueCommandInput.classType(),
-                   adsk.core.FloatSliderCommandInput.classType(), adsk.core.FloatSpinnerCommandInput.classType(),
-                   adsk.core.IntegerSliderCommandInput.classType(), adsk.core.IntegerSpinnerCommandInput.classType(),
-                   adsk.core.ValueCommandInput.classType(), adsk.core.SliderCommandInput.classType(),
-                   adsk.core.StringValueCommandInput.classType()]
+# The value of the input is returned
+def _value_extractor(command_input):
+    return command_input.value
 
-    list_types = [adsk.core.ButtonRowCommandInput.classType(), adsk.core.DropDownCommandInput.classType(),
-                  adsk.core.RadioButtonGroupCommandInput.classType()]
 
-    selection_types = [adsk.core.SelectionCommandInput.classType()]
+# The name of the selected list item is returned
+def _list_extractor(command_input):
+    return command_input.selectedItem.name
 
-    input_values = {}
-    input_values.clear()
 
-    for command_input in command_inputs:
+# An array of entities is returned, nothing if there is no selection
+def _selection_extractor(command_input):
+    if command_input.selectionCount == 0:
+        return None
 
-        # If the input type is in this list the value of the input is returned
-        if command_input.objectType in value_types:
-            input_values[command_input.id] = command_input.value
-            input_values[command_input.id + '_input'] = command_input
+    return [command_input.selection(i).entity for i in range(0, command_input.selectionCount)]
 
-        # If the input type is in this list the name of the selected list item is returned
-        elif command_input.objectType in list_types:
-            input_values[command_input.id] = command_input.selectedItem.name
-            input_values[command_input.id + '_input'] = command_input
 
-        # If the input type is a selection an array of entities is returned
-        elif command_input.objectType in selection_types:
-            if command_input.selectionCount > 0:
-                selections = []
-                for i in range(0, command_input.selectionCount):
-                    selections.append(command_input.selection(i).entity)
+# Any other input returns its name
+def _name_extractor(command_input):
+    return command_input.name
 
-                input_values[command_input.id] = selections
-                input_values[command_input.id + '_input'] = command_input
 
-        else:
-            input_values[command_input.id] = command_input.name
+# Maps the objectType of a command input to the function that reads its value, built once on import
+INPUT_EXTRACTORS = {}
+
+for _input_class in [adsk.core.BoolValueCommandInput, adsk.core.DistanceValueCommandInput,
+                     adsk.core.FloatSliderCommandInput, adsk.core.FloatSpinnerCommandInput,
+                     adsk.core.IntegerSliderCommandInput, adsk.core.IntegerSpinnerCommandInput,
+                     adsk.core.ValueCommandInput, adsk.core.SliderCommandInput,
+                     adsk.core.StringValueCommandInput]:
+    INPUT_EXTRACTORS[_input_class.classType()] = _value_extractor
+
+for _input_class in [adsk.core.ButtonRowCommandInput, adsk.core.DropDownCommandInput,
+                     adsk.core.RadioButtonGroupCommandInput]:
+    INPUT_EXTRACTORS[_input_class.classType()] = _list_extractor
+
+INPUT_EXTRACTORS[adsk.core.SelectionCommandInput.classType()] = _selection_extractor
+
+
+# Returns a dictionary for all inputs. Very useful for creating quick Fusion 360 Add-ins
+# If input_ids is given only those inputs are read
+def get_inputs(command_inputs, input_ids=None):
+
+    if input_ids is None:
+        input_list = command_inputs
+    else:
+        input_list = [command_inputs.itemById(input_id) for input_id in input_ids]
+
+    input_values = {}
+
+    for command_input in input_list:
+
+        if command_input is None:
+            continue
+
+        extractor = INPUT_EXTRACTORS.get(command_input.objectType, _name_extractor)
+        value = extractor(command_input)
+
+        # Inputs without a value (empty selections) are left out
+        if value is not None:
+            input_values[command_input.id] = value
             input_values[command_input.id + '_input'] = command_input
 
     return input_values
@@ -160,6 +184,9 @@ class Fusion360CommandBase:
 
         self.command_in_nav_bar = cmd_def.get('command_in_nav_bar', False)
 
+        # Ids of the inputs read for each event, None reads all inputs
+        self.input_ids = cmd_def.get('input_ids', None)
+
         self.debug = debug
 
         # global set of event handlers to keep them referenced for the duration of the command
@@ -174,6 +201,9 @@ class Fusion360CommandBase:
     def on_input_changed(self, command_, command_inputs, changed_input, input_values):
         pass
 
+    def on_validate(self, command, inputs, args, input_values):
+        pass
+
     def on_execute(self, command, inputs, args, input_values):
         pass
 
@@ -188,6 +218,9 @@ class Fusion360CommandBase:
 
         try:
 
+            # Keep cached application objects in sync with the active document
+            start_app_object_events()
+
             cmd_definitions = ui.commandDefinitions
 
             controls_to_add_to = get_controls(self.command_in_nav_bar, self.workspace, self.toolbar_panel_id, ui)
@@ -255,6 +288,10 @@ class Fusion360CommandBase:
             if ui:
                 ui.messageBox('AddIn Stop Failed: {}'.format(traceback.format_exc()))
 
+        # Document handlers are removed even if the controls could not be
+        finally:
+            stop_app_object_events()
+
 
 class ExecutePreviewHandler(adsk.core.CommandEventHandler):
     def __init__(self, cmd_object):
@@ -273,7 +310,7 @@ class ExecutePreviewHandler(adsk.core.CommandEventHandler):
             if self.cmd_object_.debug:
                 ui.messageBox('***Debug *** Preview: {} execute preview event triggered'.
                               format(command_.parentCommandDefinition.id))
-            input_values = get_inputs(command_inputs)
+            input_values = get_inputs(command_inputs, self.cmd_object_.input_ids)
             self.cmd_object_.on_preview(command_, command_inputs, args, input_values)
 
         except:
@@ -299,7 +336,7 @@ class DestroyHandler(adsk.core.CommandEventHandler):
                 ui.messageBox('***Debug ***Command: {} destroyed'.format(command_.parentCommandDefinition.id))
                 ui.messageBox("***Debug ***Reason for termination= " + str(reason_))
 
-            input_values = get_inputs(command_inputs)
+            input_values = get_inputs(command_inputs, self.cmd_object_.input_ids)
 
             self.cmd_object_.on_destroy(command_, command_inputs, reason_, input_values)
 
@@ -326,7 +363,7 @@ class InputChangedHandler(adsk.core.InputChangedEventHandler):
                 ui.messageBox('***Debug Input: {} changed event triggered'.format(command_.parentCommandDefinition.id))
                 ui.messageBox('***Debug The Input: {} was the command'.format(changed_input.id))
 
-            input_values = get_inputs(command_inputs)
+            input_values = get_inputs(command_inputs, self.cmd_object_.input_ids)
 
             self.cmd_object_.on_input_changed(command_, command_inputs, changed_input, input_values)
 
@@ -335,6 +372,28 @@ class InputChangedHandler(adsk.core.InputChangedEventHandler):
                 ui.messageBox('Input changed event failed: {}'.format(traceback.format_exc()))
 
 
+class ValidateInputsHandler(adsk.core.ValidateInputsEventHandler):
+    def __init__(self, cmd_object):
+        super().__init__()
+        self.cmd_object_ = cmd_object
+
+    def notify(self, args):
+        app = adsk.core.Application.cast(adsk.core.Application.get())
+        ui = app.userInterface
+
+        try:
+            command_ = args.firingEvent.sender
+            command_inputs = command_.commandInputs
+
+            input_values = get_inputs(command_inputs, self.cmd_object_.input_ids)
+
+            self.cmd_object_.on_validate(command_, command_inputs, args, input_values)
+
+        except:
+            if ui:
+                ui.messageBox('Validate inputs event failed: {}'.format(traceback.format_exc()))
+
+
 class CommandExecuteHandler(adsk.core.CommandEventHandler):
     def __init__(self, cmd_object):
         super().__init__()
@@ -350,7 +409,7 @@ class CommandExecuteHandler(adsk.core.CommandEventHandler):
             if self.cmd_object_.debug:
                 ui.messageBox('***Debug command: {} executed successfully'.format(command_.parentCommandDefinition.id))
 
-            input_values = get_inputs(command_inputs)
+            input_values = get_inputs(command_inputs, self.cmd_object_.input_ids)
 
             self.cmd_object_.on_execute(command_, command_inputs, args, input_values)
 
@@ -386,6 +445,10 @@ class CommandCreatedEventHandler(adsk.core.CommandCreatedEventHandler):
             command_.destroy.add(on_destroy_handler)
             handlers.append(on_destroy_handler)
 
+            on_validate_inputs_handler = ValidateInputsHandler(self.cmd_object_)
+            command_.validateInputs.add(on_validate_inputs_handler)
+            handlers.append(on_validate_inputs_handler)
+
             on_execute_preview_handler = ExecutePreviewHandler(self.cmd_object_)
             command_.executePreview.add(on_execute_preview_handler)
             handlers.append(on_execute_preview_handler)
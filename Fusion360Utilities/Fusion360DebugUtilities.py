@@ -2,6 +2,8 @@ __author__ = 'rainsbp'
 
 import time
 import os
+import functools
+from contextlib import contextmanager
 from os.path import expanduser
 
 import adsk.core
@@ -24,9 +26,165 @@ def variable_message(variables):
         ui.messageBox(message_string)
 
 
+# Set with set_perf_enabled, perf_stage and perf_timed do nothing while False
+perf_enabled = False
+
+# Rolling log is moved to a .old file when it grows past this size
+max_perf_log_bytes = 1000000
+
+# Totals for each stage: [calls, wall time, cpu time, max wall time]
+_perf_stats = {}
+
+# Parameters of the outermost active stage, written with every nested stage
+_perf_parameters = []
+
+# Rows of the rolling log not written yet, kept in memory so no file is touched inside a timed stage
+_perf_log_rows = []
+
+
 # Performance time logging function
+# Uses wall time so time spent in the Fusion kernel is included
 def perf_log(log, function_reference, command, identifier=''):
-    log.append((function_reference, command, identifier, time.process_time()))
+    log.append((function_reference, command, identifier, time.perf_counter()))
+
+
+def set_perf_enabled(enabled):
+    """
+    Turns stage timing on or off
+    :param enabled: True to record stage times
+    :type enabled: bool
+    """
+    global perf_enabled
+    perf_enabled = enabled
+
+
+@contextmanager
+def perf_stage(stage, **parameters):
+    """
+    Times a block of code as a named stage
+    Records wall and CPU time, adds them to the stage totals and buffers a row for the rolling log.
+    Buffered rows are written by flush_perf_log, write_perf_report flushes them.
+    Parameters given to the outermost stage are written with every stage nested inside it.
+    :param stage: Name of the stage
+    :type stage: str
+    :param parameters: Parameters to record with the stage, for example the vent inputs
+    """
+    if not perf_enabled:
+        yield
+        return
+
+    if parameters:
+        _perf_parameters.append(parameters)
+
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+
+    try:
+        yield
+
+    finally:
+        wall_time = time.perf_counter() - start_wall
+        cpu_time = time.process_time() - start_cpu
+
+        stats = _perf_stats.setdefault(stage, [0, 0.0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += wall_time
+        stats[2] += cpu_time
+        stats[3] = max(stats[3], wall_time)
+
+        context = _perf_parameters[0] if _perf_parameters else {}
+        _perf_log_rows.append((time.time(), stage, wall_time, cpu_time, context))
+
+        if parameters:
+            _perf_parameters.pop()
+
+
+def perf_timed(stage=None):
+    """
+    Decorator that times every call of a function as a stage
+    :param stage: Name of the stage, defaults to the function name
+    :type stage: str
+    """
+    def decorator(function):
+        stage_name = stage or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not perf_enabled:
+                return function(*args, **kwargs)
+
+            with perf_stage(stage_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def perf_reset():
+    """
+    Clears the stage totals used by perf_report
+    """
+    _perf_stats.clear()
+
+
+def perf_report():
+    """
+    Aggregated stage times, slowest stage first
+    :return: One line per stage with calls, total, mean and max wall time and total CPU time
+    :rtype: str
+    """
+    report = '{:<30}{:>8}{:>12}{:>12}{:>12}{:>12}\n'.format('Stage', 'Calls', 'Wall (s)', 'Mean (s)', 'Max (s)',
+                                                          'CPU (s)')
+
+    for stage, stats in sorted(_perf_stats.items(), key=lambda item: item[1][1], reverse=True):
+        calls, wall_time, cpu_time, max_wall_time = stats
+        report += '{:<30}{:>8}{:>12.4f}{:>12.4f}{:>12.4f}{:>12.4f}\n'.format(stage, calls, wall_time,
+                                                                           wall_time / calls, max_wall_time,
+                                                                           cpu_time)
+
+    return report
+
+
+def write_perf_report():
+    """
+    Writes perf_report to a time stamped file next to the rolling log and flushes the buffered log rows
+    :return: The full path of the report file
+    :rtype: str
+    """
+    flush_perf_log()
+
+    time_stamp = time.strftime("%Y-%m-%d-%H-%M-%S", time.gmtime())
+    report_file_name = get_log_directory() + 'FusionDebugUtilities-PerfReport-' + time_stamp + '.txt'
+
+    with open(report_file_name, 'w') as report_file:
+        report_file.write(perf_report())
+
+    return report_file_name
+
+
+def flush_perf_log():
+    """
+    Appends the buffered stage timings to the rolling log and clears the buffer
+    Call outside of any timed stage, for example when the command is destroyed.
+    """
+    if not _perf_log_rows:
+        return
+
+    log_file_name = get_log_directory() + 'FusionDebugUtilities-PerfLog.csv'
+
+    if os.path.exists(log_file_name) and os.path.getsize(log_file_name) > max_perf_log_bytes:
+        os.replace(log_file_name, log_file_name + '.old')
+
+    with open(log_file_name, 'a') as log_file:
+        for row_time, stage, wall_time, cpu_time, parameters in _perf_log_rows:
+            parameter_string = ' '.join(key + '=' + str(value) for key, value in sorted(parameters.items()))
+            time_stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(row_time))
+
+            log_file.write(time_stamp + ',' + stage + ',' + '%0.6f' % wall_time + ',' + '%0.6f' % cpu_time + ',' +
+                           parameter_string + '\n')
+
+    del _perf_log_rows[:]
 
 
 def perf_message(log):
@@ -58,8 +216,8 @@ def perf_message(log):
         ui.messageBox(message_string)
 
 
-# Creates directory and returns file name for log file
-def get_log_file_name():
+# Creates and returns the directory for log files
+def get_log_directory():
 
     # Get Home directory
     home = expanduser("~")
@@ -69,6 +227,14 @@ def get_log_file_name():
     if not os.path.exists(home):
         os.makedirs(home)
 
+    return home
+
+
+# Creates directory and returns file name for log file
+def get_log_file_name():
+
+    home = get_log_directory()
+
     time_stamp = time.strftime("%Y-%m-%d-%H-%M-%S", time.gmtime())
 
     # Create file name in this path
@@ -4,47 +4,117 @@ import adsk.core
 import adsk.fusion
 import traceback
 
+from .Fusion360DebugUtilities import perf_timed
+
+
+# Resolves each application object from the ones it depends on
+_APP_OBJECT_RESOLVERS = {
+    'app': lambda app_objects: adsk.core.Application.cast(adsk.core.Application.get()),
+    'import_manager': lambda app_objects: app_objects['app'].importManager,
+    'ui': lambda app_objects: app_objects['app'].userInterface,
+    'design': lambda app_objects: adsk.fusion.Design.cast(app_objects['app'].activeProduct),
+    'document': lambda app_objects: app_objects['app'].activeDocument,
+    'units_manager': lambda app_objects: app_objects['design'].fusionUnitsManager,
+    'export_manager': lambda app_objects: app_objects['design'].exportManager,
+    'root_comp': lambda app_objects: app_objects['design'].rootComponent,
+    'time_line': lambda app_objects: app_objects['design'].timeline,
+    'all_occurrences': lambda app_objects: app_objects['root_comp'].allOccurrences,
+    'all_components': lambda app_objects: app_objects['design'].allComponents,
+}
+
+# Collections that change as the design is edited, resolved again on every access
+_UNCACHED_APP_OBJECTS = ['all_occurrences', 'all_components']
+
+# Application objects of the active document, cleared when the active document changes
+_app_objects = None
+
+# Document event handlers that clear the cached application objects
+_app_object_handlers = []
+
+
+class AppObjects(dict):
+    """
+    Application objects of one document
+    Each member is resolved from the API on first access and then cached,
+    except the occurrence and component lists which are resolved on every access.
+    Use item access (app_objects['ui']), dict.get does not resolve missing members.
+    """
+
+    def __init__(self, app, document):
+        super().__init__(app=app, document=document)
+
+    def __missing__(self, key):
+        resolver = _APP_OBJECT_RESOLVERS[key]
+        value = resolver(self)
+
+        if key not in _UNCACHED_APP_OBJECTS:
+            self[key] = value
+
+        return value
+
 
 # Externally usable function to get all relevant application objects easily in a dictionary
 def get_app_objects():
+    """
+    Gets the application objects of the active document
+    The same lazily populated AppObjects is returned while the same document is active.
+    :return: Application objects keyed by name
+    :rtype: AppObjects
+    """
+    global _app_objects
 
-    app = adsk.core.Application.cast(adsk.core.Application.get())
+    app = adsk.core.Application.get()
+    document = app.activeDocument
 
-    # Get import manager
-    import_manager = app.importManager
+    if _app_objects is None or _app_objects['document'] != document:
+        _app_objects = AppObjects(app, document)
 
-    # Get User Interface
-    ui = app.userInterface
+    return _app_objects
 
-    # Get active design
-    product = app.activeProduct
-    design = adsk.fusion.Design.cast(product)
-    document = app.activeDocument
 
-    # Get Design specific elements
-    units_manager = design.fusionUnitsManager
-    export_manager = design.exportManager
-    root_comp = design.rootComponent
-    time_line = product.timeline
-
-    # Get top level collections
-    all_occurrences = root_comp.allOccurrences
-    all_components = design.allComponents
-
-    app_objects = {
-        'app': app,
-        'design': design,
-        'import_manager': import_manager,
-        'ui': ui,
-        'units_manager': units_manager,
-        'all_occurrences': all_occurrences,
-        'all_components': all_components,
-        'root_comp': root_comp,
-        'time_line': time_line,
-        'export_manager': export_manager,
-        'document': document
-    }
-    return app_objects
+def clear_app_objects():
+    """
+    Clears the cached application objects, they will be resolved again on next access
+    """
+    global _app_objects
+
+    _app_objects = None
+
+
+class AppObjectsDocumentHandler(adsk.core.DocumentEventHandler):
+    def __init__(self):
+        super().__init__()
+
+    def notify(self, args):
+        clear_app_objects()
+
+
+def start_app_object_events():
+    """
+    Clears the cached application objects whenever a document is activated or closed
+    Safe to call more than once, the handlers are only added the first time.
+    """
+    if _app_object_handlers:
+        return
+
+    app = adsk.core.Application.get()
+
+    for event in [app.documentActivated, app.documentClosed]:
+        handler = AppObjectsDocumentHandler()
+        event.add(handler)
+        _app_object_handlers.append((event, handler))
+
+
+def stop_app_object_events():
+    """
+    Removes the document event handlers added by start_app_object_events
+    """
+    for event, handler in _app_object_handlers:
+        event.remove(handler)
+
+    del _app_object_handlers[:]
+
+    clear_app_objects()
 
 
 def start_group():
@@ -159,6 +229,7 @@ def create_component(target_component, name) -> adsk.fusion.Occurrence:
 
 
 # Creates rectangle pattern of bodies based on vectors
+@perf_timed()
 def rect_body_pattern(target_component, bodies, x_axis, y_axis, x_qty, x_distance, y_qty, y_distance):
     move_feats = target_component.features.moveFeatures
 
@@ -208,10 +279,67 @@ def rect_body_pattern(target_component, bodies, x_axis, y_axis, x_qty, x_distanc
     return all_bodies
 
 
+@perf_timed()
+def rect_feature_pattern(target_component, bodies, x_entity, y_entity, x_qty, x_distance, y_qty, y_distance):
+    """
+    Creates a rectangle pattern of bodies with a single native rectangular pattern feature
+    Unlike rect_body_pattern the number of timeline features does not grow with the pattern size.
+    :param target_component: The component for the pattern feature
+    :type target_component: adsk.fusion.Component
+    :param bodies: The seed bodies to pattern
+    :type bodies: adsk.core.ObjectCollection
+    :param x_entity: Linear entity defining the first direction (sketch line, edge or construction axis)
+    :type x_entity: adsk.core.Base
+    :param y_entity: Linear entity defining the second direction
+    :type y_entity: adsk.core.Base
+    :param x_qty: Number of instances in the first direction
+    :type x_qty: int
+    :param x_distance: Spacing between instances in the first direction
+    :type x_distance: float
+    :param y_qty: Number of instances in the second direction
+    :type y_qty: int
+    :param y_distance: Spacing between instances in the second direction
+    :type y_distance: float
+    :return: Collection of the seed bodies and all patterned bodies
+    :rtype: adsk.core.ObjectCollection
+    """
+    pattern_features = target_component.features.rectangularPatternFeatures
+
+    input_entities = adsk.core.ObjectCollection.create()
+    all_bodies = adsk.core.ObjectCollection.create()
+
+    for body in bodies:
+        input_entities.add(body)
+        all_bodies.add(body)
+
+    # Nothing to pattern
+    if x_qty * y_qty <= 1:
+        return all_bodies
+
+    pattern_input = pattern_features.createInput(input_entities, x_entity,
+                                                 adsk.core.ValueInput.createByReal(x_qty),
+                                                 adsk.core.ValueInput.createByReal(x_distance),
+                                                 adsk.fusion.PatternDistanceType.SpacingPatternDistanceType)
+
+    pattern_input.setDirectionTwo(y_entity,
+                                  adsk.core.ValueInput.createByReal(y_qty),
+                                  adsk.core.ValueInput.createByReal(y_distance))
+
+    pattern_feature = pattern_features.add(pattern_input)
+
+    for body in pattern_feature.bodies:
+        if not all_bodies.contains(body):
+            all_bodies.add(body)
+
+    return all_bodies
+
+
 # Creates Combine Feature in target with all tool bodies as source
 # Specify operation as: adsk.fusion.FeatureOperations
 # target_body -> single body
 # tool_bodies -> list of bodies
+# Returns the combine feature, a cut can split the target into several feature.bodies
+@perf_timed()
 def combine_feature(target_body, tool_bodies, operation):
 
     # Get Combine Features
@@ -226,4 +354,63 @@ def combine_feature(target_body, tool_bodies, operation):
     # Create Combine Feature
     combine_input = combine_features.createInput(target_body, combine_tools)
     combine_input.operation = operation
-    combine_features.add(combine_input)
\ No newline at end of file
+    return combine_features.add(combine_input)
+
+
+@perf_timed()
+def add_temporary_body(target_component, body):
+    """
+    Adds a temporary BRep body to a component
+    In a parametric design the body is placed in a new base feature.
+    :param target_component: The component for the new body
+    :type target_component: adsk.fusion.Component
+    :param body: The temporary body to add, it is copied and can be reused
+    :type body: adsk.fusion.BRepBody
+    :return: The new body in the design
+    :rtype: adsk.fusion.BRepBody
+    """
+    design = get_app_objects()['design']
+
+    if design.designType == adsk.fusion.DesignTypes.DirectDesignType:
+        return target_component.bRepBodies.add(body)
+
+    base_feature = target_component.features.baseFeatures.add()
+    base_feature.startEdit()
+    target_component.bRepBodies.add(body, base_feature)
+    base_feature.finishEdit()
+
+    return base_feature.bodies[0]
+
+
+class StageCache:
+    """
+    Keeps the result of each stage of a build together with the key it was built from
+    A stage is only rebuilt when its key changes, so downstream keys should include upstream keys.
+    Only cache transient objects (temporary bodies, geometry, numbers), preview features are rolled back.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def get(self, stage, key, build, *args):
+        """
+        Returns the cached result of a stage or builds it
+        :param stage: Name of the stage
+        :type stage: str
+        :param key: Hashable inputs of the stage
+        :param build: Function that builds the stage result
+        :param args: Arguments passed to build
+        :return: The result of the stage
+        """
+        cached = self.stages.get(stage)
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        result = build(*args)
+        self.stages[stage] = (key, result)
+
+        return result
+
+    def clear(self):
+        self.stages.clear()
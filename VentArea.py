@@ -0,0 +1,141 @@
+"""
+Vent flow area
+
+Closed form open area of each vent type, computed from the same layout math as the geometry.
+This module does not import adsk so the area can be updated on every input change without building geometry.
+Areas are in the square of the input length units (Fusion internal units are cm).
+"""
+
+import math
+
+from . import VentLayout as vlayout
+
+
+def rectangle_opening_area(rect_width, rect_height, radius):
+    """
+    Area of a single rectangular opening with filleted corners
+    A slot is the case where the radius is half of the smaller side.
+    :param rect_width: Width of the opening
+    :type rect_width: float
+    :param rect_height: Height of the opening
+    :type rect_height: float
+    :param radius: Corner radius
+    :type radius: float
+    :return: The open area
+    :rtype: float
+    """
+    return rect_width * rect_height - (4.0 - math.pi) * radius * radius
+
+
+def rectangle_vent_area(vent_width, vent_height, vent_border, number_width, number_height, slot=False, radius=0.0):
+    """
+    Total open area of a rectangular or slot vent
+    See VentLayout.rectangle_layout for the parameters, only the opening size is computed, openings are not placed.
+    :return: The open area of all openings, zero if the openings have no size
+    :rtype: float
+    """
+    rect_width, rect_height = vlayout.rectangle_opening_size(vent_width, vent_height, vent_border, number_width,
+                                                             number_height)
+
+    if rect_width <= 0 or rect_height <= 0:
+        return 0.0
+
+    # Same corner radius as VentLayout.rectangle_layout
+    if slot:
+        radius = min(rect_width, rect_height) / 2.0
+
+    return rectangle_opening_area(rect_width, rect_height, radius) * number_width * number_height
+
+
+def hub_spoke_vent_area(vent_radius, vent_border, number_axial, number_radial):
+    """
+    Total open area of a hub and spoke vent
+    Each ring between two hubs is split into annular sectors by the spokes, each spoke and hub rib is
+    vent_border wide. Near the center, inside the radius where neighbouring spokes touch, there is no opening.
+    The small difference between the straight rib edges and the sector arcs is neglected.
+    :param vent_radius: Radius of the vent area
+    :type vent_radius: float
+    :param vent_border: Width of the spoke and hub ribs
+    :type vent_border: float
+    :param number_axial: Number of spokes
+    :type number_axial: int
+    :param number_radial: Number of hubs, including the vent boundary
+    :type number_radial: int
+    :return: The open area
+    :rtype: float
+    """
+    layout = vlayout.hub_spoke_layout(vent_radius, number_axial, number_radial)
+    half_rib = vent_border / 2.0
+
+    # Neighbouring spokes touch inside this radius
+    if number_axial > 1:
+        closed_radius = half_rib / math.sin(math.pi / number_axial)
+    else:
+        closed_radius = 0.0
+
+    ring_edges = [0.0] + [hub_radius for hub_radius in layout.hub_radii] + [vent_radius]
+
+    open_area = 0.0
+
+    for index in range(len(ring_edges) - 1):
+        inner_radius = ring_edges[index]
+        outer_radius = ring_edges[index + 1]
+
+        # The ribs of the hubs, the vent boundary has no rib
+        if index > 0:
+            inner_radius += half_rib
+
+        if index < len(ring_edges) - 2:
+            outer_radius -= half_rib
+
+        inner_radius = max(inner_radius, closed_radius)
+
+        if outer_radius <= inner_radius:
+            continue
+
+        ring_area = math.pi * (outer_radius ** 2 - inner_radius ** 2) - \
+            number_axial * vent_border * (outer_radius - inner_radius)
+
+        open_area += max(ring_area, 0.0)
+
+    return open_area
+
+
+def perforated_vent_area(vent_width, vent_height, vent_border, hole_size, hex_holes=False):
+    """
+    Total open area of a hexagonal or staggered round hole vent
+    See VentLayout.perforated_layout for the parameters.
+    :return: The open area of all holes
+    :rtype: float
+    """
+    layout = vlayout.perforated_layout(vent_width, vent_height, vent_border, hole_size, hex_holes)
+
+    if hex_holes:
+        hole_area = math.sqrt(3) / 2 * hole_size * hole_size
+    else:
+        hole_area = math.pi / 4 * hole_size * hole_size
+
+    return hole_area * len(layout.centers_x)
+
+
+def vent_area(input_values):
+    """
+    Open area of one vent from the command input values
+    :param input_values: Values from Fusion360CommandBase.get_inputs
+    :type input_values: dict
+    :return: The open area
+    :rtype: float
+    """
+    vent_type = input_values['vent_type']
+
+    if vent_type == 'Circular':
+        return hub_spoke_vent_area(input_values['vent_radius'], input_values['vent_border'],
+                                   input_values['number_axial'], input_values['number_radial'])
+
+    if vent_type in ['Hexagonal', 'Staggered']:
+        return perforated_vent_area(input_values['vent_width'], input_values['vent_height'],
+                                    input_values['vent_border'], input_values['hole_size'], vent_type == 'Hexagonal')
+
+    return rectangle_vent_area(input_values['vent_width'], input_values['vent_height'], input_values['vent_border'],
+                               input_values['number_width'], input_values['number_height'],
+                               vent_type == 'Slot', input_values['radius'])
@@ -0,0 +1,311 @@
+"""
+Vent layout math
+
+Computes the size and position of every opening for each vent type.
+This module does not import adsk so layouts can be computed, checked and timed without Fusion 360.
+All coordinates are relative to the vent center in the vent sketch plane.
+Coordinates are returned as compact array('d') buffers, wrap with numpy.frombuffer to vectorise.
+"""
+
+import math
+from array import array
+from collections import namedtuple
+
+
+# Size and pitch of the openings in a rectangular or slot vent
+# centers_x[k], centers_y[k] is the center of opening k, ordered row by row (k = j * number_width + i)
+RectangleLayout = namedtuple('RectangleLayout', ['rect_width', 'rect_height', 'x_distance', 'y_distance', 'radius',
+                                                 'centers_x', 'centers_y'])
+
+# Spokes and hubs of a hub and spoke vent
+# Spoke k runs from the vent center to (spoke_x[k], spoke_y[k]) at spoke_angles[k]
+HubSpokeLayout = namedtuple('HubSpokeLayout', ['vent_radius', 'spoke_angles', 'spoke_x', 'spoke_y', 'hub_radii'])
+
+# Holes of a hexagonal or staggered round hole vent, every row is offset by half a pitch
+# Hexagonal holes have a vertex at the top, hole_size is the width across flats or the round hole diameter
+PerforatedLayout = namedtuple('PerforatedLayout', ['hole_size', 'pitch', 'row_pitch', 'hex_holes',
+                                                   'centers_x', 'centers_y'])
+
+# Number of straight segments used to draw a circle in an outline
+CIRCLE_SEGMENTS = 48
+
+# Number of straight segments used to draw each round hole in an outline
+HOLE_SEGMENTS = 12
+
+# Points closer than this in every coordinate are the same point
+POINT_TOLERANCE = 1e-5
+
+
+def rectangle_layout(vent_width, vent_height, vent_border, number_width, number_height, slot=False, radius=0.0):
+    """
+    Calculates the openings of a rectangular or slot vent
+    :param vent_width: Total width of the vent area
+    :type vent_width: float
+    :param vent_height: Total height of the vent area
+    :type vent_height: float
+    :param vent_border: Border thickness between the openings
+    :type vent_border: float
+    :param number_width: Number of openings in width
+    :type number_width: int
+    :param number_height: Number of openings in height
+    :type number_height: int
+    :param slot: If True the corner radius is half of the smallest opening dimension
+    :type slot: bool
+    :param radius: Corner radius of the openings, ignored for slots
+    :type radius: float
+    :return: The layout of all openings
+    :rtype: RectangleLayout
+    """
+    rect_width, rect_height = rectangle_opening_size(vent_width, vent_height, vent_border, number_width,
+                                                     number_height)
+    x_distance = (rect_width + vent_border)
+    y_distance = (rect_height + vent_border)
+
+    if slot:
+        radius = min(rect_width, rect_height) / 2.0
+
+    # Center of the first opening
+    first_x = rect_width / 2 + vent_border - vent_width / 2
+    first_y = rect_height / 2 + vent_border - vent_height / 2
+
+    column_x = [first_x + i * x_distance for i in range(number_width)]
+
+    centers_x = array('d', column_x * number_height)
+    centers_y = array('d')
+
+    for j in range(number_height):
+        centers_y.extend([first_y + j * y_distance] * number_width)
+
+    return RectangleLayout(rect_width, rect_height, x_distance, y_distance, radius, centers_x, centers_y)
+
+
+def rectangle_opening_size(vent_width, vent_height, vent_border, number_width, number_height):
+    """
+    Calculates the size of each opening of a rectangular or slot vent without placing them
+    See rectangle_layout for the parameters.
+    :return: Width and height of one opening, not positive if the borders do not leave room for the openings
+    :rtype: tuple
+    """
+    rect_width = (vent_width - ((number_width + 1.0) * vent_border)) / number_width
+    rect_height = (vent_height - ((number_height + 1.0) * vent_border)) / number_height
+
+    return rect_width, rect_height
+
+
+def hub_spoke_layout(vent_radius, number_axial, number_radial):
+    """
+    Calculates the spokes and hubs of a circular vent
+    The first spoke is vertical, the rest are evenly spaced counter clockwise.
+    :param vent_radius: Radius of the vent area
+    :type vent_radius: float
+    :param number_axial: Number of spokes
+    :type number_axial: int
+    :param number_radial: Number of hubs, including the vent boundary
+    :type number_radial: int
+    :return: The layout of the spokes and inner hub circles
+    :rtype: HubSpokeLayout
+    """
+    spoke_angles = array('d', [i * 2 * math.pi / number_axial + math.pi / 2 for i in range(number_axial)])
+    spoke_x = array('d', [vent_radius * math.cos(angle) for angle in spoke_angles])
+    spoke_y = array('d', [vent_radius * math.sin(angle) for angle in spoke_angles])
+
+    # The outermost hub is the vent boundary itself
+    hub_radii = array('d', [j * vent_radius / number_radial for j in range(1, number_radial)])
+
+    return HubSpokeLayout(vent_radius, spoke_angles, spoke_x, spoke_y, hub_radii)
+
+
+def perforated_layout(vent_width, vent_height, vent_border, hole_size, hex_holes=False):
+    """
+    Calculates the holes of a hexagonal or staggered round hole vent
+    Holes are placed on a 60 degree grid so every hole is vent_border from its six neighbours.
+    The grid is clipped to the vent area, only holes at least vent_border inside the boundary are kept.
+    Each row is clipped with a closed form index range, holes are never tested one by one.
+    :param vent_width: Total width of the vent area
+    :type vent_width: float
+    :param vent_height: Total height of the vent area
+    :type vent_height: float
+    :param vent_border: Border thickness between the holes and to the boundary
+    :type vent_border: float
+    :param hole_size: Width across flats of a hexagonal hole or diameter of a round hole
+    :type hole_size: float
+    :param hex_holes: If True the holes are hexagons, otherwise circles
+    :type hex_holes: bool
+    :return: The layout of all holes
+    :rtype: PerforatedLayout
+    """
+    pitch = hole_size + vent_border
+    row_pitch = pitch * math.sqrt(3) / 2
+
+    # Half size of a hole, a hexagon is taller than it is wide
+    half_width = hole_size / 2
+    half_height = hole_size / math.sqrt(3) if hex_holes else hole_size / 2
+
+    # Largest distance of a hole center from the vent center
+    max_x = vent_width / 2 - vent_border - half_width
+    max_y = vent_height / 2 - vent_border - half_height
+
+    centers_x = array('d')
+    centers_y = array('d')
+
+    if hole_size <= 0 or vent_border < 0 or max_x < 0 or max_y < 0:
+        return PerforatedLayout(hole_size, pitch, row_pitch, hex_holes, centers_x, centers_y)
+
+    # Rows are symmetric about the center row, odd rows are shifted by half a pitch
+    half_rows = int(math.floor(max_y / row_pitch))
+
+    for row in range(-half_rows, half_rows + 1):
+        offset = pitch / 2 if row % 2 else 0.0
+
+        first = int(math.ceil((-max_x - offset) / pitch))
+        last = int(math.floor((max_x - offset) / pitch))
+
+        if last < first:
+            continue
+
+        centers_x.extend([offset + column * pitch for column in range(first, last + 1)])
+        centers_y.extend([row * row_pitch] * (last - first + 1))
+
+    return PerforatedLayout(hole_size, pitch, row_pitch, hex_holes, centers_x, centers_y)
+
+
+def hole_vertices(layout):
+    """
+    Vertices of a single hole centered on the origin, hexagons have six, round holes HOLE_SEGMENTS
+    :param layout: Layout from perforated_layout
+    :type layout: PerforatedLayout
+    :return: Vertex coordinates as x0, y0, x1, y1 counter clockwise
+    :rtype: array
+    """
+    if layout.hex_holes:
+        radius = layout.hole_size / math.sqrt(3)
+        angles = [math.pi / 2 + i * math.pi / 3 for i in range(6)]
+    else:
+        radius = layout.hole_size / 2
+        angles = [2 * math.pi * i / HOLE_SEGMENTS for i in range(HOLE_SEGMENTS)]
+
+    vertices = array('d')
+
+    for angle in angles:
+        vertices.extend((radius * math.cos(angle), radius * math.sin(angle)))
+
+    return vertices
+
+
+def perforated_outline(layout, vent_width, vent_height):
+    """
+    Line segments of the vent boundary and every hole of a hexagonal or staggered vent
+    Round holes are drawn as polygons with HOLE_SEGMENTS sides.
+    :param layout: Layout from perforated_layout
+    :type layout: PerforatedLayout
+    :param vent_width: Total width of the vent area
+    :type vent_width: float
+    :param vent_height: Total height of the vent area
+    :type vent_height: float
+    :return: Segment end points as x0, y0, x1, y1 for each segment
+    :rtype: array
+    """
+    segments = array('d')
+
+    _add_rectangle(segments, 0.0, 0.0, vent_width, vent_height)
+
+    vertices = hole_vertices(layout)
+
+    # Segments of one hole centered on the origin, moved to each center
+    hole_segments = []
+
+    for index in range(0, len(vertices), 2):
+        next_index = (index + 2) % len(vertices)
+        hole_segments.extend((vertices[index], vertices[index + 1], vertices[next_index], vertices[next_index + 1]))
+
+    for center_x, center_y in zip(layout.centers_x, layout.centers_y):
+        segments.extend([value + (center_y if index % 2 else center_x) for index, value in enumerate(hole_segments)])
+
+    return segments
+
+
+def unique_points(coordinates, tolerance=POINT_TOLERANCE):
+    """
+    Finds the first of each group of coincident points
+    Points are snapped to a grid of the tolerance, so two points within the tolerance on either side of a grid
+    line are kept as separate points.
+    :param coordinates: Point coordinates as x0, y0, z0, x1, y1, z1
+    :type coordinates: array
+    :param tolerance: Distance below which points are coincident
+    :type tolerance: float
+    :return: Indices of the points to keep, in their original order
+    :rtype: list
+    """
+    seen = set()
+    indices = []
+
+    for index in range(len(coordinates) // 3):
+        key = (round(coordinates[3 * index] / tolerance), round(coordinates[3 * index + 1] / tolerance),
+               round(coordinates[3 * index + 2] / tolerance))
+
+        if key not in seen:
+            seen.add(key)
+            indices.append(index)
+
+    return indices
+
+
+def rectangle_outline(layout, vent_width, vent_height):
+    """
+    Line segments of the vent boundary and every opening of a rectangular or slot vent
+    Openings are drawn with sharp corners, the fillets are left out of the outline.
+    :param layout: Layout from rectangle_layout
+    :type layout: RectangleLayout
+    :param vent_width: Total width of the vent area
+    :type vent_width: float
+    :param vent_height: Total height of the vent area
+    :type vent_height: float
+    :return: Segment end points as x0, y0, x1, y1 for each segment
+    :rtype: array
+    """
+    segments = array('d')
+
+    _add_rectangle(segments, 0.0, 0.0, vent_width, vent_height)
+
+    for center_x, center_y in zip(layout.centers_x, layout.centers_y):
+        _add_rectangle(segments, center_x, center_y, layout.rect_width, layout.rect_height)
+
+    return segments
+
+
+def hub_spoke_outline(layout, circle_segments=CIRCLE_SEGMENTS):
+    """
+    Line segments of the vent boundary, spokes and hubs of a hub and spoke vent
+    :param layout: Layout from hub_spoke_layout
+    :type layout: HubSpokeLayout
+    :param circle_segments: Number of straight segments drawn for each circle
+    :type circle_segments: int
+    :return: Segment end points as x0, y0, x1, y1 for each segment
+    :rtype: array
+    """
+    segments = array('d')
+
+    for spoke_x, spoke_y in zip(layout.spoke_x, layout.spoke_y):
+        segments.extend((0.0, 0.0, spoke_x, spoke_y))
+
+    circle_x = [math.cos(2 * math.pi * i / circle_segments) for i in range(circle_segments + 1)]
+    circle_y = [math.sin(2 * math.pi * i / circle_segments) for i in range(circle_segments + 1)]
+
+    for radius in list(layout.hub_radii) + [layout.vent_radius]:
+        for i in range(circle_segments):
+            segments.extend((radius * circle_x[i], radius * circle_y[i],
+                             radius * circle_x[i + 1], radius * circle_y[i + 1]))
+
+    return segments
+
+
+def _add_rectangle(segments, center_x, center_y, width, height):
+    left = center_x - width / 2
+    right = center_x + width / 2
+    bottom = center_y - height / 2
+    top = center_y + height / 2
+
+    segments.extend((left, bottom, right, bottom,
+                     right, bottom, right, top,
+                     right, top, left, top,
+                     left, top, left, bottom))
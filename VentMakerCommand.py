@@ -1,4 +1,7 @@
 import math
+import threading
+from array import array
+import time
 
 import traceback
 
@@ -7,15 +10,38 @@ import adsk.fusion
 
 from .Fusion360Utilities import Fusion360Utilities as futil
 from .Fusion360Utilities.Fusion360Utilities import get_app_objects
-from .Fusion360Utilities.Fusion360CommandBase import Fusion360CommandBase
+from .Fusion360Utilities.Fusion360CommandBase import Fusion360CommandBase, get_inputs
+from .Fusion360Utilities.Fusion360DebugUtilities import perf_stage, perf_timed
+from .Fusion360Utilities import Fusion360DebugUtilities as debug_util
+from . import VentLayout as vlayout
+from . import VentArea as varea
+from . import VentSolver as vsolver
+from . import VentValidator as vvalidator
 
 # Ideas:
-# TODO defer preview check box
-# TODO Flow Area for Circle
-# TODO Flow area units still off for rectangle?
-# TODO Other shapes, Arcs in grid?
+# TODO Arcs in grid?
 
+# Custom event used to re-run the preview after inputs stop changing
+DEBOUNCE_EVENT_ID = 'ventMaker_debounce_preview'
 
+# Next face hit by the ray cast from each vent point, see next_face_hit
+_ray_cache = {}
+
+# Error shown when a vent center point is not on a face of its component
+NO_FACE_MESSAGE = 'The point you selected does not lie on a valid face The Vent cannot be built'
+
+
+# Returns the face of the component the point lies on
+def point_face(target_component, world_point):
+    target_face = target_component.findBRepUsingPoint(world_point, adsk.fusion.BRepEntityTypes.BRepFaceEntityType)
+
+    if target_face.count == 0:
+        raise Exception(NO_FACE_MESSAGE)
+
+    return target_face[0]
+
+
+@perf_timed()
 def create_vent_sketch(center_point):
     # Get Component for feature
     target_component = center_point.parentSketch.parentComponent
@@ -23,68 +49,166 @@ def create_vent_sketch(center_point):
     # Get point in world CS
     world_point = center_point.worldGeometry
 
+    # Get target face for sketch
+    target_face = point_face(target_component, world_point)
+
     # Create a new sketch on the plane.
+    sketch = face_sketch(target_component, target_face)
+
+    center_point_sketch = sketch.project(center_point)
+
+    return sketch, center_point_sketch[0], target_component, target_face
+
+
+class VentSketches:
+    """
+    Vent sketches of one command invocation, one sketch for each target face
+    Every build stage of every vent on a face draws into the same sketch, so the face lookup,
+    sketch creation and construction sweep are paid once per face and each center point is projected once.
+    """
+
+    def __init__(self):
+        # (target face, sketch) for each face
+        self.face_sketches = []
+
+        # (center point, (sketch, projected center point, target component, target face)) for each point
+        self.point_sketches = []
+
+        # (sketch, [(profile, x, y), ...]) for each sketch that profiles were read from
+        self.sketch_profiles = []
+
+    def get(self, center_point):
+        """
+        Returns the vent sketch of the face the center point lies on
+        The target face is found before any vent feature exists, once a vent has been cut from the face
+        read it again from sketch.referencePlane.
+        :param center_point: The center of the vent
+        :type center_point: adsk.fusion.SketchPoint
+        :return: The sketch, the center point projected into it, the target component and the target face
+        :rtype: tuple
+        """
+        for point, vent_sketch in self.point_sketches:
+            if point == center_point:
+                return vent_sketch
+
+        target_component = center_point.parentSketch.parentComponent
+        target_face = point_face(target_component, center_point.worldGeometry)
+
+        for face, sketch in self.face_sketches:
+            if face == target_face:
+                break
+
+        else:
+            sketch = face_sketch(target_component, target_face)
+            self.face_sketches.append((target_face, sketch))
+
+        center_point_sketch = sketch.project(center_point)
+
+        vent_sketch = (sketch, center_point_sketch[0], target_component, target_face)
+        self.point_sketches.append((center_point, vent_sketch))
+
+        return vent_sketch
+
+    def profile_centers(self, sketch):
+        """
+        Returns the profiles of a sketch with the center of their bounding boxes
+        Profiles are read once per sketch, all curves must be drawn before the first call.
+        :param sketch: A sketch returned by get
+        :type sketch: adsk.fusion.Sketch
+        :return: (profile, x, y) for each profile in sketch space
+        :rtype: list
+        """
+        for profile_sketch, profile_centers in self.sketch_profiles:
+            if profile_sketch == sketch:
+                return profile_centers
+
+        profile_centers = []
+
+        for profile in sketch.profiles:
+            bounding_box = profile.boundingBox
+            profile_centers.append((profile, (bounding_box.minPoint.x + bounding_box.maxPoint.x) / 2,
+                                    (bounding_box.minPoint.y + bounding_box.maxPoint.y) / 2))
+
+        self.sketch_profiles.append((sketch, profile_centers))
+
+        return profile_centers
+
+
+# Creates a sketch on the face without projecting the face edges
+# So every profile in the sketch is an opening, only the vent center point is projected later
+def face_sketch(target_component, target_face):
     sketches = target_component.sketches
 
-    # Get target face for sketch
-    target_face = target_component.findBRepUsingPoint(world_point, 1)
+    try:
+        return sketches.addWithoutEdges(target_face)
+
+    # API versions without addWithoutEdges, project the edges and make them construction
+    except AttributeError:
+        pass
+
+    except:
+        raise Exception(NO_FACE_MESSAGE)
 
     try:
-        sketch = sketches.add(target_face[0])
+        sketch = sketches.add(target_face)
 
     except:
-        raise Exception('The point you selected does not lie on a valid face The Vent cannot be built')
+        raise Exception(NO_FACE_MESSAGE)
 
     for curve in sketch.sketchCurves:
         curve.isConstruction = True
 
-    center_point_sketch = sketch.project(center_point)
-
-    return sketch, center_point_sketch[0], target_component, target_face[0]
+    return sketch
 
 
 # Creates Rectangular Vents
-def rectangle_vents(vent_width, vent_height, vent_border, number_width, number_height, center_point, slot, radius_in):
+def rectangle_vents(vent_width, vent_height, vent_border, number_width, number_height, center_point, slot, radius_in,
+                    build_method='Pattern Feature', build_cache=None, extent_type='To Next', extent_distance=0.0):
+    # Built from cached temporary bodies, no sketch
+    if build_method == 'Incremental':
+        if build_cache is None:
+            build_cache = futil.StageCache()
+
+        return rectangle_vents_incremental(build_cache, vent_width, vent_height, vent_border, number_width,
+                                           number_height, [center_point], slot, radius_in, extent_type,
+                                           extent_distance)
+
+    # All openings as profiles of one sketch, cut with one extrude
+    if build_method == 'Sketch Profiles':
+        return rectangle_vents_profiles(vent_width, vent_height, vent_border, number_width, number_height,
+                                        center_point, slot, radius_in, extent_type, extent_distance)
+
     # Initialize a sketch
     sketch, center_point_sketch, target_component, target_face = create_vent_sketch(center_point)
 
     target_body = sketch.referencePlane.body
 
-    rect_width = (vent_width - ((number_width + 1.0) * vent_border)) / number_width
-    rect_height = (vent_height - ((number_height + 1.0) * vent_border)) / number_height
-    x_distance = (rect_width + vent_border)
-    y_distance = (rect_height + vent_border)
+    layout = vlayout.rectangle_layout(vent_width, vent_height, vent_border, number_width, number_height,
+                                      slot, radius_in)
 
-    if slot:
-        radius = min(rect_width, rect_height) / 2.0
-
-    else:
-        radius = radius_in
-
-    vent_origin_x = center_point_sketch.geometry.x - vent_width / 2
-    vent_origin_y = center_point_sketch.geometry.y - vent_height / 2
+    rect_width = layout.rect_width
+    rect_height = layout.rect_height
+    x_distance = layout.x_distance
+    y_distance = layout.y_distance
+    radius = layout.radius
 
     lines = sketch.sketchCurves.sketchLines
 
     # Draw a rectangle
-    rect_center_point_x = (rect_width / 2 + vent_border) + vent_origin_x
-    rect_center_point_y = (rect_height / 2 + vent_border) + vent_origin_y
+    rect_center_point_x = center_point_sketch.geometry.x + layout.centers_x[0]
+    rect_center_point_y = center_point_sketch.geometry.y + layout.centers_y[0]
 
-    rect = lines.addCenterPointRectangle(adsk.core.Point3D.create(rect_center_point_x,
-                                                                  rect_center_point_y, 0),
-                                         adsk.core.Point3D.create(rect_center_point_x + rect_width / 2,
-                                                                  rect_center_point_y + rect_height / 2, 0))
+    draw_filleted_rectangle(sketch, rect_center_point_x, rect_center_point_y, rect_width, rect_height, radius)
 
-    if radius > 0:
-        # Fillet Rectangle
-        sketch.sketchCurves.sketchArcs.addFillet(rect[0], rect[0].endSketchPoint.geometry,
-                                                 rect[1], rect[1].startSketchPoint.geometry, radius)
-        sketch.sketchCurves.sketchArcs.addFillet(rect[1], rect[1].endSketchPoint.geometry,
-                                                 rect[2], rect[2].startSketchPoint.geometry, radius)
-        sketch.sketchCurves.sketchArcs.addFillet(rect[2], rect[2].endSketchPoint.geometry,
-                                                 rect[3], rect[3].startSketchPoint.geometry, radius)
-        sketch.sketchCurves.sketchArcs.addFillet(rect[3], rect[3].endSketchPoint.geometry,
-                                                 rect[0], rect[0].startSketchPoint.geometry, radius)
+    # Construction lines from the first opening used as pattern directions
+    x_direction_line = lines.addByTwoPoints(adsk.core.Point3D.create(rect_center_point_x, rect_center_point_y, 0),
+                                            adsk.core.Point3D.create(rect_center_point_x + x_distance,
+                                                                     rect_center_point_y, 0))
+    y_direction_line = lines.addByTwoPoints(adsk.core.Point3D.create(rect_center_point_x, rect_center_point_y, 0),
+                                            adsk.core.Point3D.create(rect_center_point_x,
+                                                                     rect_center_point_y + y_distance, 0))
+    x_direction_line.isConstruction = True
+    y_direction_line.isConstruction = True
 
     # Create Collection for extrusion Profile
     profiles = adsk.core.ObjectCollection.create()
@@ -93,19 +217,20 @@ def rectangle_vents(vent_width, vent_height, vent_border, number_width, number_h
     profiles.add(profile)
 
     # Calculate the total flow area
-    area_props = profile.areaProperties()
-    flow_area = area_props.area * number_width * number_height
+    flow_area = varea.rectangle_opening_area(rect_width, rect_height, radius) * number_width * number_height
 
     # Create extrude body of profile
-    single_vent_feature = to_next_extrude(profiles, target_component, target_face, center_point_sketch,
-                                          adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    single_vent_feature = vent_extrude(profiles, target_component, target_face, center_point_sketch,
+                                       adsk.fusion.FeatureOperations.NewBodyFeatureOperation, extent_type,
+                                       extent_distance)
 
     # Get a bodies collection from the extrude
     single_vent_bodies = get_body_from_feature(single_vent_feature)
 
     # Pattern the bodies
-    pattern_bodies = futil.rect_body_pattern(target_component, single_vent_bodies, sketch.xDirection, sketch.yDirection,
-                                             number_width, x_distance, number_height, y_distance)
+    pattern_bodies = pattern_vent_bodies(target_component, single_vent_bodies, sketch, x_direction_line,
+                                         y_direction_line, number_width, x_distance, number_height, y_distance,
+                                         build_method)
 
     # Combine Boundary (Cut)
     operation = adsk.fusion.FeatureOperations.CutFeatureOperation
@@ -114,6 +239,607 @@ def rectangle_vents(vent_width, vent_height, vent_border, number_width, number_h
     return flow_area
 
 
+# Draws a rectangle with filleted corners, no fillets if radius is zero
+def draw_filleted_rectangle(sketch, center_x, center_y, rect_width, rect_height, radius):
+    lines = sketch.sketchCurves.sketchLines
+
+    rect = lines.addCenterPointRectangle(adsk.core.Point3D.create(center_x, center_y, 0),
+                                         adsk.core.Point3D.create(center_x + rect_width / 2,
+                                                                  center_y + rect_height / 2, 0))
+
+    if radius > 0:
+        # Fillet Rectangle
+        sketch.sketchCurves.sketchArcs.addFillet(rect[0], rect[0].endSketchPoint.geometry,
+                                                 rect[1], rect[1].startSketchPoint.geometry, radius)
+        sketch.sketchCurves.sketchArcs.addFillet(rect[1], rect[1].endSketchPoint.geometry,
+                                                 rect[2], rect[2].startSketchPoint.geometry, radius)
+        sketch.sketchCurves.sketchArcs.addFillet(rect[2], rect[2].endSketchPoint.geometry,
+                                                 rect[3], rect[3].startSketchPoint.geometry, radius)
+        sketch.sketchCurves.sketchArcs.addFillet(rect[3], rect[3].endSketchPoint.geometry,
+                                                 rect[0], rect[0].startSketchPoint.geometry, radius)
+
+    return rect
+
+
+# Creates Rectangular Vents with every opening drawn in the vent sketch
+# All profiles are cut with a single extrude, no bodies are copied, moved or combined
+def rectangle_vents_profiles(vent_width, vent_height, vent_border, number_width, number_height, center_point, slot,
+                             radius_in, extent_type='To Next', extent_distance=0.0):
+    # Initialize a sketch
+    sketch, center_point_sketch, target_component, target_face = create_vent_sketch(center_point)
+
+    layout = vlayout.rectangle_layout(vent_width, vent_height, vent_border, number_width, number_height,
+                                      slot, radius_in)
+
+    center_x = center_point_sketch.geometry.x
+    center_y = center_point_sketch.geometry.y
+
+    extrude_sketch_openings(sketch, lambda vent_sketch: draw_layout_openings(vent_sketch, center_x, center_y, layout),
+                            center_point_sketch, extent_type, extent_distance)
+
+    return varea.rectangle_opening_area(layout.rect_width, layout.rect_height, layout.radius) * \
+        number_width * number_height
+
+
+# Creates Hexagonal or Staggered round hole Vents
+# Every hole is drawn in one sketch and all profiles are cut with a single extrude
+@perf_timed()
+def perforated_vents(vent_width, vent_height, vent_border, hole_size, center_point, hex_holes,
+                     extent_type='To Next', extent_distance=0.0):
+    # Initialize a sketch
+    sketch, center_point_sketch, target_component, target_face = create_vent_sketch(center_point)
+
+    layout = vlayout.perforated_layout(vent_width, vent_height, vent_border, hole_size, hex_holes)
+
+    if len(layout.centers_x) == 0:
+        raise Exception('No holes fit in the vent area, reduce the hole size or border thickness')
+
+    center_x = center_point_sketch.geometry.x
+    center_y = center_point_sketch.geometry.y
+
+    extrude_sketch_openings(sketch, lambda vent_sketch: draw_layout_openings(vent_sketch, center_x, center_y, layout),
+                            center_point_sketch, extent_type, extent_distance)
+
+    return varea.perforated_vent_area(vent_width, vent_height, vent_border, hole_size, hex_holes)
+
+
+# Draws the openings in a sketch on the vent face and cuts all of its profiles with one extrude
+# draw(sketch) adds the openings, the sketch is solved once after all of them are drawn
+# Face edges are not in the sketch, so every profile is an opening
+def extrude_sketch_openings(sketch, draw, center_point_sketch, extent_type='To Next', extent_distance=0.0):
+    sketch.isComputeDeferred = True
+
+    draw(sketch)
+
+    sketch.isComputeDeferred = False
+
+    profiles = adsk.core.ObjectCollection.create()
+
+    for profile in sketch.profiles:
+        profiles.add(profile)
+
+    # The face is read from the sketch, it follows the face when earlier vents have cut it
+    return vent_extrude(profiles, sketch.parentComponent, sketch.referencePlane, center_point_sketch,
+                        adsk.fusion.FeatureOperations.CutFeatureOperation, extent_type, extent_distance)
+
+
+# Draws every opening of a rectangle or perforated layout around the center
+def draw_layout_openings(sketch, center_x, center_y, layout):
+    if not isinstance(layout, vlayout.PerforatedLayout):
+        for rect_center_x, rect_center_y in zip(layout.centers_x, layout.centers_y):
+            draw_filleted_rectangle(sketch, center_x + rect_center_x, center_y + rect_center_y,
+                                    layout.rect_width, layout.rect_height, layout.radius)
+
+    elif layout.hex_holes:
+        vertices = vlayout.hole_vertices(layout)
+
+        for hole_x, hole_y in zip(layout.centers_x, layout.centers_y):
+            draw_polygon(sketch, center_x + hole_x, center_y + hole_y, vertices)
+
+    else:
+        circles = sketch.sketchCurves.sketchCircles
+
+        for hole_x, hole_y in zip(layout.centers_x, layout.centers_y):
+            circles.addByCenterRadius(adsk.core.Point3D.create(center_x + hole_x, center_y + hole_y, 0),
+                                      layout.hole_size / 2)
+
+
+# Creates the vents at every center point with one sketch and one extrude per face and end face
+# Coincident points are only built once, for every vent type except Circular
+@perf_timed()
+def point_cloud_vents(input_values, center_points):
+    if input_values['vent_type'] in ['Hexagonal', 'Staggered']:
+        layout = vent_perforated_layout(input_values)
+    else:
+        layout = vlayout.rectangle_layout(input_values['vent_width'], input_values['vent_height'],
+                                          input_values['vent_border'], input_values['number_width'],
+                                          input_values['number_height'], input_values['vent_type'] == 'Slot',
+                                          input_values['radius'])
+
+    # Read every point once
+    world_points = [center_point.worldGeometry for center_point in center_points]
+    coordinates = array('d')
+
+    for world_point in world_points:
+        coordinates.extend((world_point.x, world_point.y, world_point.z))
+
+    unique_indices = vlayout.unique_points(coordinates)
+
+    extent_type = input_values['extent_type']
+
+    # [target face, end face, [(center point, world point), ...]] for each group of points
+    # Points over a boss or a pocket end on another face than their neighbours, they are cut separately
+    face_points = []
+
+    for index in unique_indices:
+        target_component = center_points[index].parentSketch.parentComponent
+        target_face = point_face(target_component, world_points[index])
+
+        end_face = None
+
+        if extent_type == 'To Next' and plate_thickness(target_face.body) is None:
+            end_face, hit_point = next_face_hit(target_component, target_face, world_points[index])
+
+        for face_group in face_points:
+            if face_group[0] == target_face and face_group[1] == end_face:
+                face_group[2].append((center_points[index], world_points[index]))
+                break
+
+        else:
+            face_points.append([target_face, end_face, [(center_points[index], world_points[index])]])
+
+    # Every sketch is created before the first cut, the faces found above are only valid until then
+    group_sketches = [(face_sketch(points[0][0].parentSketch.parentComponent, target_face), points)
+                      for target_face, end_face, points in face_points]
+
+    for sketch, points in group_sketches:
+        def draw_points(vent_sketch, points=points):
+            for center_point, world_point in points:
+                sketch_point = vent_sketch.modelToSketchSpace(world_point)
+                draw_layout_openings(vent_sketch, sketch_point.x, sketch_point.y, layout)
+
+        # Every point of the group ends on the same face, the extent is found from the first one
+        extrude_sketch_openings(sketch, draw_points, points[0][0], extent_type, input_values['extent_distance'])
+
+    return varea.vent_area(input_values) * len(unique_indices)
+
+
+# Draws a closed polygon through the vertices (x0, y0, x1, y1, ...) moved to the center
+# Each line starts on the end point of the previous one so the polygon forms a profile
+def draw_polygon(sketch, center_x, center_y, vertices):
+    lines = sketch.sketchCurves.sketchLines
+
+    first_line = None
+    line = None
+
+    for index in range(0, len(vertices), 2):
+        next_index = (index + 2) % len(vertices)
+        end_point = adsk.core.Point3D.create(center_x + vertices[next_index], center_y + vertices[next_index + 1], 0)
+
+        if line is None:
+            start_point = adsk.core.Point3D.create(center_x + vertices[index], center_y + vertices[index + 1], 0)
+            line = first_line = lines.addByTwoPoints(start_point, end_point)
+
+        elif next_index == 0:
+            line = lines.addByTwoPoints(line.endSketchPoint, first_line.startSketchPoint)
+
+        else:
+            line = lines.addByTwoPoints(line.endSketchPoint, end_point)
+
+    return first_line
+
+
+# Creates Rectangular Vents from temporary bodies at one or more center points
+# Each stage is cached in build_cache and only rebuilt when its own inputs change:
+# frame (center point) -> seed (one opening) -> row (first row) -> pattern (all rows) -> placed (moved to the face)
+# The frame does not depend on the layout, border and count changes reuse it
+# The seed only depends on the opening size and radius, the row and pattern also on the opening centers
+# Points with the same depth share the seed and pattern, the vents in each target body are cut with one combine
+def rectangle_vents_incremental(build_cache, vent_width, vent_height, vent_border, number_width, number_height,
+                                center_points, slot, radius_in, extent_type='To Next', extent_distance=0.0):
+    layout = vlayout.rectangle_layout(vent_width, vent_height, vent_border, number_width, number_height,
+                                      slot, radius_in)
+
+    # [target body, tool body] for each body that is cut
+    target_tools = []
+
+    # Vent plane axes of each face, see vent_plane
+    face_axes = []
+
+    for index, center_point in enumerate(center_points):
+        target_component = center_point.parentSketch.parentComponent
+
+        world_point = center_point.worldGeometry
+        frame_key = (world_point.x, world_point.y, world_point.z, extent_type, extent_distance)
+
+        frame_transform, depth = build_cache.get(('frame', index), frame_key, vent_frame, center_point,
+                                                 target_component, extent_type, extent_distance, face_axes)
+
+        seed_key = (layout.rect_width, layout.rect_height, layout.radius, depth)
+        seed_body = build_cache.get(('seed', depth), seed_key, opening_temporary_body,
+                                    layout.rect_width, layout.rect_height, layout.radius, depth)
+
+        row_key = (seed_key, layout.centers_x[:number_width].tobytes(), layout.centers_y[0])
+        row_body = build_cache.get(('row', depth), row_key, row_temporary_body,
+                                   seed_body, layout.centers_x, layout.centers_y, number_width)
+
+        pattern_key = (row_key, layout.centers_y[::number_width].tobytes())
+        pattern_body = build_cache.get(('pattern', depth), pattern_key, pattern_temporary_body,
+                                       row_body, layout.centers_x, layout.centers_y, number_width)
+
+        placed_key = (pattern_key, frame_key)
+        placed_body = build_cache.get(('placed', index), placed_key, transform_temporary_body, pattern_body,
+                                      frame_transform)
+
+        add_target_tool(target_tools, center_point, placed_body)
+
+    cut_target_tools(target_tools)
+
+    return varea.rectangle_opening_area(layout.rect_width, layout.rect_height, layout.radius) * \
+        number_width * number_height * len(center_points)
+
+
+# Adds a placed temporary tool body to the tool of the body under its center point
+# The target body is looked up every time, design entities do not survive the preview roll back
+def add_target_tool(target_tools, center_point, placed_body):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+
+    target_component = center_point.parentSketch.parentComponent
+    target_body = point_face(target_component, center_point.worldGeometry).body
+
+    for target_tool in target_tools:
+        if target_tool[0] == target_body:
+            brep.booleanOperation(target_tool[1], placed_body, adsk.fusion.BooleanTypes.UnionBooleanType)
+            return
+
+    target_tools.append([target_body, brep.copy(placed_body)])
+
+
+# Cuts each target body with its tool, one base feature and one combine per body
+def cut_target_tools(target_tools):
+    for target_body, tool_temporary_body in target_tools:
+        tool_body = futil.add_temporary_body(target_body.parentComponent, tool_temporary_body)
+
+        # Combine Boundary (Cut)
+        operation = adsk.fusion.FeatureOperations.CutFeatureOperation
+        futil.combine_feature(target_body, [tool_body], operation)
+
+
+# Creates Hub and Spoke Vents from temporary bodies at one or more center points
+# The timeline only gets one base feature and one combine per target body, whatever the number of spokes and hubs
+def hub_spoke_vents_compact(build_cache, vent_radius, vent_border, number_axial, number_radial, center_points,
+                            extent_type='To Next', extent_distance=0.0):
+    layout = vlayout.hub_spoke_layout(vent_radius, number_axial, number_radial)
+
+    # [target body, tool body] for each body that is cut
+    target_tools = []
+
+    # Vent plane axes of each face, see vent_plane
+    face_axes = []
+
+    for index, center_point in enumerate(center_points):
+        target_component = center_point.parentSketch.parentComponent
+
+        world_point = center_point.worldGeometry
+        frame_key = (world_point.x, world_point.y, world_point.z, extent_type, extent_distance)
+
+        frame_transform, depth = build_cache.get(('frame', index), frame_key, vent_frame, center_point,
+                                                 target_component, extent_type, extent_distance, face_axes)
+
+        vent_key = (vent_radius, vent_border, number_axial, number_radial, depth)
+        vent_body = build_cache.get(('hub_spoke', depth), vent_key, hub_spoke_temporary_body, layout,
+                                    vent_border, depth)
+
+        placed_body = build_cache.get(('placed', index), (vent_key, frame_key), transform_temporary_body,
+                                      vent_body, frame_transform)
+
+        add_target_tool(target_tools, center_point, placed_body)
+
+    cut_target_tools(target_tools)
+
+
+# Creates a temporary body for a hub and spoke vent centered on the origin, cut from z = 0 to z = -depth
+# The boundary cylinder minus a box for each spoke and a ring for each hub
+@perf_timed()
+def hub_spoke_temporary_body(layout, vent_border, depth):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+    difference = adsk.fusion.BooleanTypes.DifferenceBooleanType
+
+    vent_radius = layout.vent_radius
+
+    def cylinder(radius):
+        return brep.createCylinderOrCone(adsk.core.Point3D.create(0, 0, 0), radius,
+                                         adsk.core.Point3D.create(0, 0, -depth), radius)
+
+    vent_body = cylinder(vent_radius)
+
+    # Spokes run from the center past the boundary
+    spoke_length = vent_radius + vent_border / 2
+
+    for spoke_angle in layout.spoke_angles:
+        direction_x = math.cos(spoke_angle)
+        direction_y = math.sin(spoke_angle)
+
+        spoke_center = adsk.core.Point3D.create(direction_x * spoke_length / 2, direction_y * spoke_length / 2,
+                                                -depth / 2)
+        spoke = brep.createBox(adsk.core.OrientedBoundingBox3D.create(spoke_center,
+                                                                     adsk.core.Vector3D.create(direction_x,
+                                                                                               direction_y, 0),
+                                                                     adsk.core.Vector3D.create(-direction_y,
+                                                                                               direction_x, 0),
+                                                                     spoke_length, vent_border, depth))
+        brep.booleanOperation(vent_body, spoke, difference)
+
+    for hub_radius in layout.hub_radii:
+        hub = cylinder(hub_radius + vent_border / 2)
+
+        if hub_radius > vent_border / 2:
+            brep.booleanOperation(hub, cylinder(hub_radius - vent_border / 2), difference)
+
+        brep.booleanOperation(vent_body, hub, difference)
+
+    return vent_body
+
+
+# Returns the state of a body, it changes whenever the body is modified
+def body_state(body):
+    try:
+        return body.revisionId
+
+    # Older API versions have no revision id
+    except:
+        return body.area, body.volume
+
+
+# Returns the thickness of a sheet metal body, None if the thickness is not known
+def plate_thickness(body):
+    try:
+        if body.isSheetMetal:
+            thickness = body.parentComponent.activeSheetMetalRule.thickness.value
+
+            if thickness > 0:
+                return thickness
+
+    except:
+        pass
+
+    return None
+
+
+# Returns the next face hit by a ray from the point into the face and the point where it is hit
+# Results are cached by point and body state so repeated previews skip the ray cast
+# Face temp ids change when the preview is rolled back, they are not part of the key
+# Each point keeps only the result for the latest body state, so the cache does not grow with edits
+@perf_timed()
+def next_face_hit(target_component, target_face, world_point):
+    key = (round(world_point.x, 6), round(world_point.y, 6), round(world_point.z, 6))
+    state = body_state(target_face.body)
+
+    cached = _ray_cache.get(key)
+
+    if cached is not None and cached[0] == state and cached[1].isValid:
+        return cached[1], cached[2]
+
+    (normal_return, ray_direction) = target_face.evaluator.getNormalAtPoint(world_point)
+    ray_direction.scaleBy(-1.0)
+
+    # Cast ray to determine next face and where it is hit
+    hit_points = adsk.core.ObjectCollection.create()
+    hit_faces = target_component.findBRepUsingRay(world_point, ray_direction,
+                                                   adsk.fusion.BRepEntityTypes.BRepFaceEntityType, -1.0, True,
+                                                   hit_points)
+
+    # Check if source face is included in returned set, function of ray cast tolerance
+    if hit_faces.count > 0 and hit_faces[0].tempId == target_face.tempId:
+        next_index = 1
+    else:
+        next_index = 0
+
+    if hit_faces.count <= next_index:
+        raise Exception('It appears your vent is not completely terminated by the opposite face')
+
+    _ray_cache[key] = (state, hit_faces[next_index], hit_points[next_index])
+
+    return hit_faces[next_index], hit_points[next_index]
+
+
+def clear_ray_cache():
+    _ray_cache.clear()
+
+
+# Returns a depth that cuts through the whole body from any point on its surface
+def through_all_depth(body):
+    bounding_box = body.boundingBox
+    return bounding_box.minPoint.distanceTo(bounding_box.maxPoint)
+
+
+# Returns the x and y directions of a sketch on the face, the sketch built vents are drawn in these axes
+# The sketch is only created to read its axes and is deleted again
+def face_sketch_axes(target_component, target_face):
+    sketch = face_sketch(target_component, target_face)
+
+    x_axis = sketch.xDirection
+    y_axis = sketch.yDirection
+
+    sketch.deleteMe()
+
+    return x_axis, y_axis
+
+
+# Returns the center point in world space, the face it lies on and the axes of the vent plane
+# The vent plane uses the axes of a sketch on the face, so it matches the vents built from the face sketch
+# face_axes: list of (face, (x axis, y axis)) shared between calls so each face is only sketched once
+def vent_plane(center_point, face_axes=None):
+    world_point = center_point.worldGeometry
+    target_component = center_point.parentSketch.parentComponent
+
+    target_face = point_face(target_component, world_point)
+
+    if face_axes is None:
+        face_axes = []
+
+    for face, axes in face_axes:
+        if face == target_face:
+            break
+
+    else:
+        axes = face_sketch_axes(target_component, target_face)
+        face_axes.append((target_face, axes))
+
+    x_axis, y_axis = axes
+    z_axis = x_axis.crossProduct(y_axis)
+
+    return world_point, target_face, x_axis, y_axis, z_axis
+
+
+# Returns the transform from the vent plane to the model and the depth of the cut
+# Only the 'To Next' extent casts a ray, 'Blind' uses the distance and 'Through All' the size of the body
+@perf_timed()
+def vent_frame(center_point, target_component, extent_type='To Next', extent_distance=0.0, face_axes=None):
+    world_point, target_face, x_axis, y_axis, z_axis = vent_plane(center_point, face_axes)
+
+    thickness = plate_thickness(target_face.body)
+
+    if extent_type == 'Blind':
+        depth = extent_distance
+
+    elif extent_type == 'Through All':
+        depth = through_all_depth(target_face.body)
+
+    elif thickness is not None:
+        depth = thickness
+
+    else:
+        next_face, hit_point = next_face_hit(target_component, target_face, world_point)
+        depth = world_point.distanceTo(hit_point)
+
+    frame_transform = adsk.core.Matrix3D.create()
+    frame_transform.setWithCoordinateSystem(world_point, x_axis, y_axis, z_axis)
+
+    return frame_transform, depth
+
+
+# Creates a temporary body for one opening centered on the origin, cut from z = 0 to z = -depth
+# Built as two crossing boxes with a cylinder in each corner for the fillets
+@perf_timed()
+def opening_temporary_body(rect_width, rect_height, radius, depth):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+    union = adsk.fusion.BooleanTypes.UnionBooleanType
+
+    center = adsk.core.Point3D.create(0, 0, -depth / 2)
+    x_direction = adsk.core.Vector3D.create(1, 0, 0)
+    y_direction = adsk.core.Vector3D.create(0, 1, 0)
+
+    tolerance = 1e-6
+    boxes = []
+
+    if radius <= tolerance:
+        boxes.append((rect_width, rect_height))
+
+    else:
+        if rect_height - 2 * radius > tolerance:
+            boxes.append((rect_width, rect_height - 2 * radius))
+
+        if rect_width - 2 * radius > tolerance:
+            boxes.append((rect_width - 2 * radius, rect_height))
+
+    opening_body = None
+
+    for box_width, box_height in boxes:
+        box = brep.createBox(adsk.core.OrientedBoundingBox3D.create(center, x_direction, y_direction,
+                                                                    box_width, box_height, depth))
+        if opening_body is None:
+            opening_body = box
+        else:
+            brep.booleanOperation(opening_body, box, union)
+
+    if radius > tolerance:
+        corners = set([(sign_x * (rect_width / 2 - radius), sign_y * (rect_height / 2 - radius))
+                       for sign_x in [-1, 1] for sign_y in [-1, 1]])
+
+        for corner_x, corner_y in corners:
+            cylinder = brep.createCylinderOrCone(adsk.core.Point3D.create(corner_x, corner_y, 0), radius,
+                                                 adsk.core.Point3D.create(corner_x, corner_y, -depth), radius)
+            if opening_body is None:
+                opening_body = cylinder
+            else:
+                brep.booleanOperation(opening_body, cylinder, union)
+
+    return opening_body
+
+
+# Copies the seed body along the first row of openings and unions the copies into one temporary body
+# centers_x, centers_y are ordered row by row as in VentLayout.rectangle_layout
+@perf_timed()
+def row_temporary_body(seed_body, centers_x, centers_y, number_width):
+    return union_temporary_copies(seed_body, centers_x[:number_width], centers_y[:number_width])
+
+
+# Copies the row body to every row and unions them, the grid takes number_width + number_height booleans
+@perf_timed()
+def pattern_temporary_body(row_body, centers_x, centers_y, number_width):
+    first_x = centers_x[0]
+    first_y = centers_y[0]
+
+    row_offsets_x = [center_x - first_x for center_x in centers_x[::number_width]]
+    row_offsets_y = [center_y - first_y for center_y in centers_y[::number_width]]
+
+    return union_temporary_copies(row_body, row_offsets_x, row_offsets_y)
+
+
+# Translated copies of a temporary body unioned in a balanced tree
+# Every union joins two bodies of similar size instead of adding one copy at a time to a growing body
+def union_temporary_copies(body, offsets_x, offsets_y):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+    union = adsk.fusion.BooleanTypes.UnionBooleanType
+
+    bodies = []
+
+    for offset_x, offset_y in zip(offsets_x, offsets_y):
+        copy_body = brep.copy(body)
+
+        transform = adsk.core.Matrix3D.create()
+        transform.translation = adsk.core.Vector3D.create(offset_x, offset_y, 0)
+        brep.transform(copy_body, transform)
+
+        bodies.append(copy_body)
+
+    while len(bodies) > 1:
+        for target_body, tool_body in zip(bodies[::2], bodies[1::2]):
+            brep.booleanOperation(target_body, tool_body, union)
+
+        bodies = bodies[::2]
+
+    return bodies[0]
+
+
+# Returns a transformed copy of a temporary body
+def transform_temporary_body(body, transform):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+
+    transformed_body = brep.copy(body)
+    brep.transform(transformed_body, transform)
+
+    return transformed_body
+
+
+# Patterns the single vent bodies into the full grid
+# 'Pattern Feature' uses one rectangular pattern feature, 'Copy Bodies' copies and moves each body
+def pattern_vent_bodies(target_component, bodies, sketch, x_direction_line, y_direction_line,
+                        number_width, x_distance, number_height, y_distance, build_method):
+    if build_method == 'Pattern Feature':
+        try:
+            return futil.rect_feature_pattern(target_component, bodies, x_direction_line, y_direction_line,
+                                              number_width, x_distance, number_height, y_distance)
+
+        # Fall back to copy and move if the native pattern can not be computed
+        except:
+            pass
+
+    return futil.rect_body_pattern(target_component, bodies, sketch.xDirection, sketch.yDirection,
+                                   number_width, x_distance, number_height, y_distance)
+
+
 # Returns collection of bodies created from input feature
 def get_body_from_feature(feature):
     # Create collection for bodies
@@ -127,25 +853,24 @@ def get_body_from_feature(feature):
 
 
 # Creates the equivalent of a to next extrude
+@perf_timed()
 def to_next_extrude(profiles_, target_component, target_face, center_point_sketch, operation):
-    # Get normal vector to face in opposite direction
-    (normal_return, normal_vector) = target_face.evaluator.getNormalAtPoint(center_point_sketch.worldGeometry)
-    normal_vector.scaleBy(-1.0)
-
-    # Cast ray to determine next face
-    hit_faces = target_component.findBRepUsingRay(center_point_sketch.worldGeometry, normal_vector, 1)
-
-    # Check if source face is included in returned set, function of ray cast tolerance
-    if hit_faces[0].tempId == target_face.tempId:
-        next_face = hit_faces[1]
-    else:
-        next_face = hit_faces[0]
-
     # Create an extrusion input to be able to define the input needed for an extrusion
     extrudes = target_component.features.extrudeFeatures
     ext_input = extrudes.createInput(profiles_, operation)
-    to_next_extent = adsk.fusion.ToEntityExtentDefinition.create(next_face, False)
-    ext_input.setOneSideExtent(to_next_extent, adsk.fusion.ExtentDirections.PositiveExtentDirection)
+
+    thickness = plate_thickness(target_face.body)
+
+    # Through a plate of known thickness, no ray cast needed
+    # A distance has no target to reach, it goes into the part, opposite to the face normal
+    if thickness is not None:
+        extent = adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByReal(thickness))
+        ext_input.setOneSideExtent(extent, adsk.fusion.ExtentDirections.NegativeExtentDirection)
+
+    else:
+        next_face, hit_point = next_face_hit(target_component, target_face, center_point_sketch.worldGeometry)
+        to_next_extent = adsk.fusion.ToEntityExtentDefinition.create(next_face, False)
+        ext_input.setOneSideExtent(to_next_extent, adsk.fusion.ExtentDirections.PositiveExtentDirection)
 
     try:
         extrude_feature = extrudes.add(ext_input)
@@ -155,48 +880,109 @@ def to_next_extrude(profiles_, target_component, target_face, center_point_sketc
         raise Exception('It appears your vent is not completely terminated by the opposite face')
 
 
+# Extrudes the profiles into the part with the selected extent
+# 'To Next' finds the opposite face with a ray cast, 'Blind' and 'Through All' need no ray cast
+def vent_extrude(profiles_, target_component, target_face, center_point_sketch, operation, extent_type='To Next',
+                 extent_distance=0.0):
+    if extent_type == 'To Next':
+        return to_next_extrude(profiles_, target_component, target_face, center_point_sketch, operation)
+
+    extrudes = target_component.features.extrudeFeatures
+    ext_input = extrudes.createInput(profiles_, operation)
+
+    if extent_type == 'Blind':
+        extent = adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByReal(extent_distance))
+    else:
+        extent = adsk.fusion.ThroughAllExtentDefinition.create()
+
+    # Into the part, opposite to the face normal
+    ext_input.setOneSideExtent(extent, adsk.fusion.ExtentDirections.NegativeExtentDirection)
+
+    try:
+        return extrudes.add(ext_input)
+
+    except:
+        raise Exception('The vent could not be extruded with the {} extent'.format(extent_type))
+
+
+# Draws the vent boundary circle in the shared vent sketch
+def circle_boundary_sketch(vent_radius, center_point, vent_sketches):
+    boundary_sketch, center_point_sketch, target_component, target_face = vent_sketches.get(center_point)
+
+    return boundary_sketch.sketchCurves.sketchCircles.addByCenterRadius(center_point_sketch, vent_radius)
+
+
 # Create extruded body for vent outline
-def circle_boundary_extrude(vent_radius, center_point):
-    # Create Boundary Sketch
-    boundary_sketch, center_point_sketch, target_component, target_face = create_vent_sketch(center_point)
+# The spokes and hubs are in the same sketch, the boundary is every profile inside the vent circle
+def circle_boundary_extrude(vent_radius, center_point, extent_type, extent_distance, vent_sketches):
+    boundary_sketch, center_point_sketch, target_component, target_face = vent_sketches.get(center_point)
+
+    # Read the face from the sketch, it follows the face as features are added to the part
+    target_face = boundary_sketch.referencePlane
+
+    center_point_geom = center_point_sketch.geometry
+
+    profiles = adsk.core.ObjectCollection.create()
+
+    for profile, profile_x, profile_y in vent_sketches.profile_centers(boundary_sketch):
+        offset_x = profile_x - center_point_geom.x
+        offset_y = profile_y - center_point_geom.y
 
-    # Create circle for vent boundary
-    boundary_curve = boundary_sketch.sketchCurves.sketchCircles.addByCenterRadius(center_point_sketch, vent_radius)
+        if offset_x * offset_x + offset_y * offset_y < vent_radius * vent_radius:
+            profiles.add(profile)
 
     # Create extrude
-    boundary_feature = to_next_extrude(boundary_sketch.profiles[0], target_component, target_face, center_point_sketch,
-                                       adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    boundary_feature = vent_extrude(profiles, target_component, target_face, center_point_sketch,
+                                    adsk.fusion.FeatureOperations.NewBodyFeatureOperation, extent_type,
+                                    extent_distance)
 
     boundary_end_face = boundary_feature.endFaces[0]
-    tool_body = [boundary_feature.bodies[0]]
-    target_body = boundary_sketch.referencePlane.body
+    tool_body = [body for body in boundary_feature.bodies]
+    target_body = target_face.body
 
-    return boundary_curve, boundary_end_face, tool_body, target_body
+    # Adjacent profiles are normally extruded as one body
+    if len(tool_body) > 1:
+        join_feature = futil.combine_feature(tool_body[0], tool_body[1:],
+                                             adsk.fusion.FeatureOperations.JoinFeatureOperation)
+        tool_body = [body for body in join_feature.bodies]
+
+    return boundary_end_face, tool_body, target_body
 
 
 # Creates Sketch for hub-spoke
-def hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, boundary_curve):
-    # Create Vent sketch
-    vent_sketch, vent_center_point, target_component, target_face = create_vent_sketch(center_point)
+# constrained: add coincident, vertical and dimension constraints so the sketch can be edited parametrically
+def hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, boundary_curve, constrained=True,
+                     vent_sketches=None):
+    if vent_sketches is None:
+        vent_sketches = VentSketches()
+
+    if not constrained:
+        return hub_spoke_sketch_unconstrained(vent_radius, number_axial, number_radial, center_point, vent_sketches)
+
+    # Draw into the sketch of the boundary
+    vent_sketch, vent_center_point, target_component, target_face = vent_sketches.get(center_point)
 
     vent_lines = vent_sketch.sketchCurves.sketchLines
     vent_circles = vent_sketch.sketchCurves.sketchCircles
     vent_constraints = vent_sketch.geometricConstraints
     vent_dims = vent_sketch.sketchDimensions
 
-    # Reference circle from previous sketch
-    project_curves = vent_sketch.project(boundary_curve)
-    project_boundary = project_curves[0]
-
     center_point_geom = vent_center_point.geometry
 
+    layout = vlayout.hub_spoke_layout(vent_radius, number_axial, number_radial)
+
+    # The boundary is a plain circle in the shared sketch, its radius is dimensioned so the sketch stays fixed
+    vent_dims.addRadialDimension(boundary_curve, adsk.core.Point3D.create(center_point_geom.x,
+                                                                          center_point_geom.y - vent_radius, 0))
+
     # Create first line
     # TODO possible option to rotate this?
-    end_point = adsk.core.Point3D.create(0, vent_radius + center_point_geom.y, 0)
+    end_point = adsk.core.Point3D.create(layout.spoke_x[0] + center_point_geom.x,
+                                         layout.spoke_y[0] + center_point_geom.y, 0)
 
     line_1 = vent_lines.addByTwoPoints(vent_center_point, end_point)
 
-    vent_constraints.addCoincident(line_1.endSketchPoint, project_boundary)
+    vent_constraints.addCoincident(line_1.endSketchPoint, boundary_curve)
 
     vent_constraints.addVertical(line_1)
 
@@ -207,14 +993,14 @@ def hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, bou
 
     # Build Axial lines
     for i in range(1, number_axial):
-        angle = i * 2 * math.pi / number_axial + math.pi / 2
+        angle = layout.spoke_angles[i]
 
-        end_point = adsk.core.Point3D.create(vent_radius * math.cos(angle) + center_point_geom.x,
-                                             vent_radius * math.sin(angle) + center_point_geom.y, 0)
+        end_point = adsk.core.Point3D.create(layout.spoke_x[i] + center_point_geom.x,
+                                             layout.spoke_y[i] + center_point_geom.y, 0)
 
         line_2 = vent_lines.addByTwoPoints(vent_center_point, end_point)
 
-        vent_constraints.addCoincident(line_2.endSketchPoint, project_boundary)
+        vent_constraints.addCoincident(line_2.endSketchPoint, boundary_curve)
 
         vent_dims.addAngularDimension(line_1, line_2,
                                       adsk.core.Point3D.create(1.5 * vent_radius * math.cos(angle / 2) +
@@ -228,8 +1014,7 @@ def hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, bou
         line_1 = line_2
 
     # Build Radial Circles:
-    for j in range(1, number_radial):
-        radial_step = j * vent_radius / number_radial
+    for radial_step in layout.hub_radii:
         new_circle = vent_circles.addByCenterRadius(vent_center_point, radial_step)
 
         vent_dims.addRadialDimension(new_circle, adsk.core.Point3D.create(center_point_geom.x,
@@ -237,13 +1022,50 @@ def hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, bou
 
         vent_profile_collection.add(target_component.createOpenProfile(new_circle, False))
 
-    project_boundary.isConstruction = True
+    return vent_profile_collection, target_component
+
+
+# Creates Sketch for hub-spoke with the lines and circles placed at their computed positions
+# No constraints or dimensions are added so the sketch solver does not run for each spoke and hub
+def hub_spoke_sketch_unconstrained(vent_radius, number_axial, number_radial, center_point, vent_sketches):
+    # Draw into the sketch of the boundary
+    vent_sketch, vent_center_point, target_component, target_face = vent_sketches.get(center_point)
+
+    vent_lines = vent_sketch.sketchCurves.sketchLines
+    vent_circles = vent_sketch.sketchCurves.sketchCircles
+
+    center_point_geom = vent_center_point.geometry
+
+    layout = vlayout.hub_spoke_layout(vent_radius, number_axial, number_radial)
+
+    vent_curves = []
+
+    vent_sketch.isComputeDeferred = True
+
+    # Build Axial lines
+    for spoke_x, spoke_y in zip(layout.spoke_x, layout.spoke_y):
+        end_point = adsk.core.Point3D.create(spoke_x + center_point_geom.x, spoke_y + center_point_geom.y, 0)
+        vent_curves.append(vent_lines.addByTwoPoints(vent_center_point, end_point))
+
+    # Build Radial Circles:
+    for radial_step in layout.hub_radii:
+        vent_curves.append(vent_circles.addByCenterRadius(vent_center_point, radial_step))
+
+    vent_sketch.isComputeDeferred = False
+
+    # Create Collection for vent Profiles
+    vent_profile_collection = adsk.core.ObjectCollection.create()
+
+    for vent_curve in vent_curves:
+        vent_profile_collection.add(target_component.createOpenProfile(vent_curve, False))
 
     return vent_profile_collection, target_component
 
 
 # Create surface based vent Extrude:
-def vent_thick_extrude(vent_border, target_component, vent_profile_collection, boundary_end_face):
+# The surfaces end on the boundary end face, a blind vent uses the same distance instead
+def vent_thick_extrude(vent_border, target_component, vent_profile_collection, boundary_end_face,
+                       extent_type='To Next', extent_distance=0.0):
     # Create Extrude
     extrudes = target_component.features.extrudeFeatures
 
@@ -251,74 +1073,263 @@ def vent_thick_extrude(vent_border, target_component, vent_profile_collection, b
                                            adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
     vent_surf_input.isSolid = False
 
-    to_extent = adsk.fusion.ToEntityExtentDefinition.create(boundary_end_face, False)
-    vent_surf_input.setOneSideExtent(to_extent, adsk.fusion.ExtentDirections.NegativeExtentDirection)
+    if extent_type == 'Blind':
+        extent = adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByReal(extent_distance))
+    else:
+        extent = adsk.fusion.ToEntityExtentDefinition.create(boundary_end_face, False)
+
+    vent_surf_input.setOneSideExtent(extent, adsk.fusion.ExtentDirections.NegativeExtentDirection)
 
     vent_surf_feature = extrudes.add(vent_surf_input)
 
     # Create thicken feature
     thicken_features = target_component.features.thickenFeatures
-    tool_body = []
     thickness = adsk.core.ValueInput.createByReal(vent_border)
 
-    faces = vent_surf_feature.faces
+    faces = [face for face in vent_surf_feature.faces]
+
+    # Thicken all faces in a single feature
+    try:
+        return thicken_face_groups(thicken_features, [faces], thickness)
+
+    except:
+        pass
+
+    # Kernel could not thicken them together, one feature per face type (spokes and hubs)
+    try:
+        return thicken_face_groups(thicken_features, group_faces_by_geometry(faces), thickness)
+
+    except:
+        pass
+
+    # Fall back to one feature per face
+    return thicken_face_groups(thicken_features, [[face] for face in faces], thickness)
 
-    for index, face in enumerate(faces):
-        input_surfaces = adsk.core.ObjectCollection.create()
 
-        input_surfaces.add(face)
-        thicken_input = thicken_features.createInput(input_surfaces, thickness, True,
-                                                     adsk.fusion.FeatureOperations.NewBodyFeatureOperation, False)
+# Creates one thicken feature per group of faces and returns all of the new bodies
+# Removes any features already created if one of the groups fails
+@perf_timed('thicken')
+def thicken_face_groups(thicken_features, face_groups, thickness):
+    tool_body = []
+    thicken_feature_list = []
+
+    try:
+        for face_group in face_groups:
+            input_surfaces = adsk.core.ObjectCollection.create()
+
+            for face in face_group:
+                input_surfaces.add(face)
 
-        thickness_feature = thicken_features.add(thicken_input)
+            thicken_input = thicken_features.createInput(input_surfaces, thickness, True,
+                                                         adsk.fusion.FeatureOperations.NewBodyFeatureOperation, False)
 
-        tool_body.append(thickness_feature.bodies[0])
+            thicken_feature = thicken_features.add(thicken_input)
+            thicken_feature_list.append(thicken_feature)
+
+            for body in thicken_feature.bodies:
+                tool_body.append(body)
+
+    except:
+        for thicken_feature in thicken_feature_list:
+            thicken_feature.deleteMe()
+        raise
 
     return tool_body
 
 
+# Groups faces by their surface type, planar spokes and cylindrical hubs
+def group_faces_by_geometry(faces):
+    face_groups = {}
+
+    for face in faces:
+        face_groups.setdefault(face.geometry.objectType, []).append(face)
+
+    return list(face_groups.values())
+
+
 # Main set of commands to define a hub and spoke style vent
-def create_hub_spoke_vent(vent_radius, vent_border, number_axial, number_radial, center_point):
-    # Create Circular Boundary sketch and Extrude
-    boundary_curve, boundary_end_face, boundary_tool_body, target_body = \
-        circle_boundary_extrude(vent_radius, center_point)
+# single_combine: the ribs are cut from the boundary body first so the target body only gets one boolean
+# constrained: create a fully constrained, editable hub and spoke sketch
+def create_hub_spoke_vent(vent_radius, vent_border, number_axial, number_radial, center_point, single_combine=True,
+                          constrained=True, extent_type='To Next', extent_distance=0.0):
+    create_hub_spoke_vents(vent_radius, vent_border, number_axial, number_radial, [center_point], single_combine,
+                           constrained, extent_type, extent_distance)
+
+
+# Creates hub and spoke vents at several center points, vents on the same face share one sketch
+# Every sketch curve is drawn before the first feature so no feature is recomputed when a later vent is drawn
+# The tool bodies of every vent are built before the part is touched, each target body is then cut once
+def create_hub_spoke_vents(vent_radius, vent_border, number_axial, number_radial, center_points, single_combine=True,
+                           constrained=True, extent_type='To Next', extent_distance=0.0):
+    vent_sketches = VentSketches()
+
+    vent_profiles = [hub_spoke_vent_sketch(vent_radius, number_axial, number_radial, center_point, constrained,
+                                           vent_sketches)
+                     for center_point in center_points]
+
+    # [target body, cut bodies, join bodies] for each body that is cut
+    target_tools = []
+
+    for center_point, (vent_profile_collection, target_component) in zip(center_points, vent_profiles):
+        target_body, cut_bodies, join_bodies = hub_spoke_vent_tools(vent_radius, vent_border, center_point,
+                                                                    vent_profile_collection, target_component,
+                                                                    single_combine, extent_type, extent_distance,
+                                                                    vent_sketches)
+
+        for target_tool in target_tools:
+            if target_tool[0] == target_body:
+                target_tool[1].extend(cut_bodies)
+                target_tool[2].extend(join_bodies)
+                break
+
+        else:
+            target_tools.append([target_body, cut_bodies, join_bodies])
+
+    for target_body, cut_bodies, join_bodies in target_tools:
+        # Combine Boundary (Cut)
+        futil.combine_feature(target_body, cut_bodies, adsk.fusion.FeatureOperations.CutFeatureOperation)
+
+        # Combine Thicken (Join)
+        if join_bodies:
+            futil.combine_feature(target_body, join_bodies, adsk.fusion.FeatureOperations.JoinFeatureOperation)
+
+
+# Draws the boundary, spokes and hubs of one vent in the shared vent sketch
+def hub_spoke_vent_sketch(vent_radius, number_axial, number_radial, center_point, constrained, vent_sketches):
+    # Create Circular Boundary
+    boundary_curve = circle_boundary_sketch(vent_radius, center_point, vent_sketches)
 
     # Create Hub and Spoke Sketch
-    vent_profile_collection, target_component = \
-        hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, boundary_curve)
+    return hub_spoke_sketch(vent_radius, number_axial, number_radial, center_point, boundary_curve, constrained,
+                            vent_sketches)
+
+
+# Extrudes the boundary and thickens the ribs of one vent, the part is not modified
+# Returns the target body, the bodies to cut from it and the bodies to join back to it
+# single_combine: the ribs are cut from the boundary here, so the target body only gets one boolean
+def hub_spoke_vent_tools(vent_radius, vent_border, center_point, vent_profile_collection, target_component,
+                         single_combine, extent_type, extent_distance, vent_sketches):
+    # Create Circular Boundary Extrude
+    boundary_end_face, boundary_tool_body, target_body = \
+        circle_boundary_extrude(vent_radius, center_point, extent_type, extent_distance, vent_sketches)
 
     # Create Thicken Extrude Feature
-    thicken_tool_body = vent_thick_extrude(vent_border, target_component, vent_profile_collection, boundary_end_face)
+    thicken_tool_body = vent_thick_extrude(vent_border, target_component, vent_profile_collection, boundary_end_face,
+                                           extent_type, extent_distance)
 
-    # Combine Boundary (Cut)
-    operation = adsk.fusion.FeatureOperations.CutFeatureOperation
-    futil.combine_feature(target_body, boundary_tool_body, operation)
+    if single_combine:
+        # Net vent bodies, boundary minus the ribs, only involves the small tool bodies
+        # The ribs split the boundary into one body per opening, all of them are cut from the part
+        net_vent_feature = futil.combine_feature(boundary_tool_body[0], thicken_tool_body,
+                                                 adsk.fusion.FeatureOperations.CutFeatureOperation)
 
-    # Combine Thicken (Join)
-    operation = adsk.fusion.FeatureOperations.JoinFeatureOperation
-    futil.combine_feature(target_body, thicken_tool_body, operation)
+        return target_body, [body for body in net_vent_feature.bodies], []
+
+    return target_body, boundary_tool_body, thicken_tool_body
 
 
 # Formats the area into a string in the current units
-# Not currently implemented
 def get_area_string(area):
 
     # Gets necessary application objects
     app_objects = get_app_objects()
     units_manager = app_objects['units_manager']
 
+    # Area is in internal units, cm^2
+    area_units = units_manager.defaultLengthUnits + '^2'
+    display_area = units_manager.convert(area, 'cm^2', area_units)
+
     # Define the string to display area.
-    area_string = units_manager.formatInternalValue(area, units_manager.defaultLengthUnits + '^2', True)
+    area_string = '{:.4g} {}'.format(display_area, area_units)
 
     return area_string
 
 
+# Shows the flow area of all vents for the current inputs, no geometry is built
+def update_flow_area(command_inputs, input_values):
+    flow_area_input = command_inputs.itemById('flow_area')
+
+    try:
+        area = varea.vent_area(input_values)
+
+        # Coincident points cut the same openings, they are only counted once as in point_cloud_vents
+        if 'center_point' in input_values:
+            area *= len(unique_center_points(vent_center_points(input_values['center_point'])))
+
+        flow_area_input.formattedText = get_area_string(area)
+
+    # Inputs are incomplete or invalid
+    except:
+        flow_area_input.formattedText = ' - '
+
+
+# Checks the inputs against the closed form layout constraints and shows the problems in the dialog
+# Runs before any geometry is built, so invalid inputs never create or roll back features
+def validate_inputs(command_inputs, input_values):
+    message_input = command_inputs.itemById('validation_message')
+
+    result = vvalidator.validate_vent(input_values)
+
+    # Reasons start with the input id, show the dialog label instead
+    messages = []
+    for reason in result.reasons:
+        input_id, _, rest = reason.partition(' ')
+        reason_input = command_inputs.itemById(input_id)
+
+        if reason_input is not None:
+            reason = reason_input.name.rstrip(': ') + ' ' + rest
+
+        messages.append(reason)
+
+    message_input.formattedText = '<br>'.join(messages)
+    message_input.isVisible = not result.valid
+
+    return result.valid
+
+
+# Inputs that change the solved counts and rib width when solving for a target area
+SOLVER_INPUTS = ['solve_area', 'target_area', 'min_border', 'max_opening', 'vent_type', 'vent_width', 'vent_height',
+                 'radius', 'vent_radius']
+
+# Inputs set by the solver, they are read only while solving
+SOLVED_INPUTS = ['vent_border', 'number_width', 'number_height', 'number_axial', 'number_radial']
+
+
+# Picks the counts and rib width for the target flow area and writes them to the inputs
+# Only the closed form area is searched, the geometry is built once from the solved inputs
+def solve_flow_area(command_inputs, input_values):
+    try:
+        solution = vsolver.solve_vent(input_values)
+
+    # Inputs are incomplete or invalid
+    except:
+        solution = None
+
+    if solution is None:
+        command_inputs.itemById('flow_area').formattedText = 'No solution'
+        return False
+
+    for input_id in SOLVED_INPUTS:
+        if input_id in solution:
+            command_inputs.itemById(input_id).value = solution[input_id]
+            input_values[input_id] = solution[input_id]
+
+    return True
+
+
 # Updates the visible fields based on vent type selection
-def change_inputs(command_inputs, vent_type):
-    input_definitions = {'Common': ['center_point', 'vent_border', 'vent_type'],
-                         'Circular': ['vent_radius', 'number_axial', 'number_radial'],
-                         'Slot': ['vent_width', 'vent_height', 'number_width', 'number_height'],
-                         'Rectangular': ['vent_width', 'vent_height', 'number_width', 'number_height', 'radius']}
+def change_inputs(command_inputs, vent_type, solve_area=False, extent_type='To Next'):
+    input_definitions = {'Common': ['center_point', 'vent_border', 'vent_type', 'extent_type', 'defer_preview',
+                                    'compact_timeline', 'point_cloud', 'solve_area', 'flow_area',
+                                    'validation_message'],
+                         'Solve': ['target_area', 'min_border', 'max_opening'],
+                         'Circular': ['vent_radius', 'number_axial', 'number_radial', 'single_combine',
+                                      'editable_sketch'],
+                         'Slot': ['vent_width', 'vent_height', 'number_width', 'number_height', 'build_method'],
+                         'Hexagonal': ['vent_width', 'vent_height', 'hole_size'],
+                         'Staggered': ['vent_width', 'vent_height', 'hole_size'],
+                         'Rectangular': ['vent_width', 'vent_height', 'number_width', 'number_height', 'radius',
+                                         'build_method']}
 
     for command_input in command_inputs:
         if command_input.id not in input_definitions['Common']:
@@ -327,39 +1338,289 @@ def change_inputs(command_inputs, vent_type):
         if command_input.id in input_definitions[vent_type]:
             command_input.isVisible = True
 
+        if solve_area and command_input.id in input_definitions['Solve']:
+            command_input.isVisible = True
+
+        if extent_type == 'Blind' and command_input.id == 'extent_distance':
+            command_input.isVisible = True
+
+        if command_input.id in SOLVED_INPUTS:
+            command_input.isEnabled = not solve_area
+
+
+# Returns the vent center points from the selected sketch points and sketches
+# For a selected sketch every point that is not connected to sketch curves is used
+def vent_center_points(selections):
+    center_points = []
+
+    for selection in selections:
+        if selection.objectType == adsk.fusion.Sketch.classType():
+            for sketch_point in selection.sketchPoints:
+                if sketch_point == selection.originPoint:
+                    continue
+
+                connected_entities = sketch_point.connectedEntities
+
+                if connected_entities is not None and connected_entities.count > 0:
+                    continue
+
+                center_points.append(sketch_point)
+
+        else:
+            center_points.append(selection)
+
+    if len(center_points) == 0:
+        raise Exception('The selected sketches do not contain any unconnected sketch points')
+
+    return center_points
+
+
+# Returns the center points without coincident points, the first point of each group is kept
+def unique_center_points(center_points):
+    coordinates = array('d')
+
+    for center_point in center_points:
+        world_point = center_point.worldGeometry
+        coordinates.extend((world_point.x, world_point.y, world_point.z))
+
+    return [center_points[index] for index in vlayout.unique_points(coordinates)]
+
+
+# Builds the full vent geometry for the current inputs
+# Returns the flow area where it is calculated
+# Sketches are only constrained outside of preview and when an editable sketch is requested
+def build_vent(input_values, build_cache=None, preview=False):
+    parameters = {key: value for key, value in input_values.items() if isinstance(value, (bool, int, float, str))}
+
+    with perf_stage('build_vent', **parameters):
+        return build_vent_stages(input_values, build_cache, preview)
+
+
+# Builds the vent with the sketch, feature or temporary body pipeline for the vent type
+def build_vent_stages(input_values, build_cache, preview):
+    area = None
+
+    if build_cache is None:
+        build_cache = futil.StageCache()
+
+    center_points = vent_center_points(input_values['center_point'])
+
+    # Only temporary bodies, one base feature and one combine per target body in the timeline
+    compact = input_values['compact_timeline'] and not preview
+
+    # One sketch and one extrude per face for all points
+    if input_values['point_cloud'] and input_values['vent_type'] != 'Circular' and not compact:
+        area = point_cloud_vents(input_values, center_points)
+
+    elif input_values['vent_type'] in ['Rectangular', 'Slot']:
+        slot = input_values['vent_type'] == 'Slot'
+
+        # Several vents share one seed and are cut with one combine per body
+        if len(center_points) > 1 or compact:
+            area = rectangle_vents_incremental(build_cache, input_values['vent_width'], input_values['vent_height'],
+                                               input_values['vent_border'],
+                                               input_values['number_width'], input_values['number_height'],
+                                               center_points, slot, input_values['radius'],
+                                               input_values['extent_type'], input_values['extent_distance'])
+
+        else:
+            area = rectangle_vents(input_values['vent_width'], input_values['vent_height'],
+                                   input_values['vent_border'],
+                                   input_values['number_width'], input_values['number_height'],
+                                   center_points[0], slot, input_values['radius'],
+                                   input_values['build_method'], build_cache,
+                                   input_values['extent_type'], input_values['extent_distance'])
+
+    elif input_values['vent_type'] in ['Hexagonal', 'Staggered']:
+        area = 0.0
+
+        # Already a single sketch and extrude per vent, there is no separate compact build
+        for center_point in center_points:
+            area += perforated_vents(input_values['vent_width'], input_values['vent_height'],
+                                     input_values['vent_border'], input_values['hole_size'], center_point,
+                                     input_values['vent_type'] == 'Hexagonal',
+                                     input_values['extent_type'], input_values['extent_distance'])
+
+    elif input_values['vent_type'] == 'Circular' and compact:
+        hub_spoke_vents_compact(build_cache, input_values['vent_radius'], input_values['vent_border'],
+                                input_values['number_axial'], input_values['number_radial'], center_points,
+                                input_values['extent_type'], input_values['extent_distance'])
+
+    elif input_values['vent_type'] == 'Circular':
+        create_hub_spoke_vents(input_values['vent_radius'], input_values['vent_border'],
+                               input_values['number_axial'],
+                               input_values['number_radial'], center_points, input_values['single_combine'],
+                               input_values['editable_sketch'] and not preview,
+                               input_values['extent_type'], input_values['extent_distance'])
+
+    return area
+
+
+# Number of openings above which the preview only draws the outlines, the features are built on OK
+GRAPHICS_PREVIEW_OPENINGS = 200
+
+# Outlines are drawn this far above the face so they are not hidden by it
+GRAPHICS_PREVIEW_OFFSET = .001
+
+
+# Returns the number of openings built for the current inputs
+def vent_opening_count(input_values):
+    if input_values['vent_type'] == 'Circular':
+        openings = input_values['number_axial'] * input_values['number_radial']
+    elif input_values['vent_type'] in ['Hexagonal', 'Staggered']:
+        openings = len(vent_perforated_layout(input_values).centers_x)
+    else:
+        openings = input_values['number_width'] * input_values['number_height']
+
+    return openings * len(vent_center_points(input_values['center_point']))
+
+
+# Returns the hole layout of a hexagonal or staggered vent
+def vent_perforated_layout(input_values):
+    return vlayout.perforated_layout(input_values['vent_width'], input_values['vent_height'],
+                                     input_values['vent_border'], input_values['hole_size'],
+                                     input_values['vent_type'] == 'Hexagonal')
+
+
+# Returns the outline of one vent as line segments in the vent plane, see VentLayout
+def vent_outline(input_values):
+    if input_values['vent_type'] == 'Circular':
+        layout = vlayout.hub_spoke_layout(input_values['vent_radius'], input_values['number_axial'],
+                                          input_values['number_radial'])
+        return vlayout.hub_spoke_outline(layout)
+
+    if input_values['vent_type'] in ['Hexagonal', 'Staggered']:
+        return vlayout.perforated_outline(vent_perforated_layout(input_values), input_values['vent_width'],
+                                          input_values['vent_height'])
+
+    layout = vlayout.rectangle_layout(input_values['vent_width'], input_values['vent_height'],
+                                      input_values['vent_border'], input_values['number_width'],
+                                      input_values['number_height'])
+    return vlayout.rectangle_outline(layout, input_values['vent_width'], input_values['vent_height'])
+
+
+# Lightweight preview, draws the vent outlines of every center point as lines in one custom graphics group
+# Nothing is added to the timeline and no BRep is built, the features are built on OK
+@perf_timed()
+def preview_vent_graphics(input_values):
+    outline = vent_outline(input_values)
+    coordinates = []
+    face_axes = []
+
+    for center_point in vent_center_points(input_values['center_point']):
+        world_point, target_face, x_axis, y_axis, z_axis = vent_plane(center_point, face_axes)
+
+        origin_x = world_point.x + z_axis.x * GRAPHICS_PREVIEW_OFFSET
+        origin_y = world_point.y + z_axis.y * GRAPHICS_PREVIEW_OFFSET
+        origin_z = world_point.z + z_axis.z * GRAPHICS_PREVIEW_OFFSET
+
+        for index in range(0, len(outline), 2):
+            u = outline[index]
+            v = outline[index + 1]
+
+            coordinates.extend((origin_x + u * x_axis.x + v * y_axis.x,
+                                origin_y + u * x_axis.y + v * y_axis.y,
+                                origin_z + u * x_axis.z + v * y_axis.z))
+
+    root_comp = get_app_objects()['root_comp']
+    graphics_group = root_comp.customGraphicsGroups.add()
+
+    # Every pair of coordinates is one line segment
+    graphics_coordinates = adsk.fusion.CustomGraphicsCoordinates.create(coordinates)
+    graphics_group.addLines(graphics_coordinates, [], False)
+
+    return graphics_group
+
+
+# Fires the debounced preview event from the timer thread
+def fire_debounce_event():
+    app = adsk.core.Application.get()
+    app.fireCustomEvent(DEBOUNCE_EVENT_ID)
+
+
+# Re-runs the preview once the inputs have stopped changing
+class DebouncePreviewHandler(adsk.core.CustomEventHandler):
+    def __init__(self, cmd_object):
+        super().__init__()
+        self.cmd_object_ = cmd_object
+
+    def notify(self, args):
+        command = self.cmd_object_.command
+
+        if command is not None and command.isValid:
+            command.doExecutePreview()
+
 
 # The following will define a command in a tool bar panel
 class VentMakerCommand(Fusion360CommandBase):
+    def __init__(self, cmd_def, debug):
+        super().__init__(cmd_def, debug)
+
+        # Seconds the inputs must be unchanged before the full geometry is previewed
+        self.debounce_time = cmd_def.get('debounce_time', .5)
+
+        self.command = None
+        self.debounce_timer = None
+        self.last_change_time = 0.0
+
+        # Custom event of the debounced preview and its handler, registered for each command session
+        self.debounce_event = None
+        self.debounce_handler = None
+
+        # Temporary bodies reused between previews when their inputs have not changed
+        self.build_cache = futil.StageCache()
+
+        # Custom graphics group of the outline preview
+        self.preview_graphics = None
+
+    # Removes the outline drawn by the last preview
+    def clear_preview_graphics(self):
+        if self.preview_graphics is not None and self.preview_graphics.isValid:
+            self.preview_graphics.deleteMe()
+
+        self.preview_graphics = None
+
+    # Starts or restarts the timer that triggers the full preview
+    def schedule_preview(self):
+        if self.debounce_timer is not None:
+            self.debounce_timer.cancel()
+
+        self.debounce_timer = threading.Timer(self.debounce_time, fire_debounce_event)
+        self.debounce_timer.start()
+
     # Runs when Fusion command would generate a preview after all inputs are valid or changed
     def on_preview(self, command, inputs, args, input_values):
 
-        start_index = futil.start_group()
+        self.command = command
+        self.clear_preview_graphics()
 
-        try:
+        # Checked in validate inputs as well, the debounced preview is started without it
+        if not validate_inputs(inputs, input_values):
+            args.isValidResult = False
+            return
 
-            if input_values['vent_type'] == 'Rectangular':
-                area = rectangle_vents(input_values['vent_width'], input_values['vent_height'],
-                                       input_values['vent_border'],
-                                       input_values['number_width'], input_values['number_height'],
-                                       input_values['center_point'][0], False, input_values['radius'])
+        try:
+            # Only draw the outline, full geometry is built when the user presses OK
+            # Large grids are always drawn as outlines, building them would not feel interactive
+            if input_values['defer_preview'] or vent_opening_count(input_values) > GRAPHICS_PREVIEW_OPENINGS:
+                self.preview_graphics = preview_vent_graphics(input_values)
+                args.isValidResult = False
+                return
 
-            elif input_values['vent_type'] == 'Circular':
-                create_hub_spoke_vent(input_values['vent_radius'], input_values['vent_border'],
-                                      input_values['number_axial'],
-                                      input_values['number_radial'], input_values['center_point'][0])
+            # Inputs are still changing, draw the outline and rebuild once they settle
+            if time.perf_counter() - self.last_change_time < self.debounce_time:
+                self.preview_graphics = preview_vent_graphics(input_values)
+                args.isValidResult = False
+                self.schedule_preview()
+                return
 
-            elif input_values['vent_type'] == 'Slot':
-                area = rectangle_vents(input_values['vent_width'], input_values['vent_height'],
-                                       input_values['vent_border'],
-                                       input_values['number_width'], input_values['number_height'],
-                                       input_values['center_point'][0], True, input_values['radius'])
+            start_index = futil.start_group()
 
-            # TODO get area working, problem with units
-            # Would need to re-add it to Common list in input changed
-            # area_string = get_area_string(area)
-            # inputs.itemById("flow_area").formattedText = area_string
+            build_vent(input_values, self.build_cache, True)
 
-            args.isValidResult = True
+            # Preview sketch is unconstrained, build the editable sketch or the compact vent on OK
+            args.isValidResult = not (input_values['compact_timeline'] or
+                                      (input_values['vent_type'] == 'Circular' and input_values['editable_sketch']))
 
             futil.end_group(start_index)
 
@@ -376,20 +1637,75 @@ class VentMakerCommand(Fusion360CommandBase):
             # Enable for more robust debugging:
             # ui.messageBox('Vent Failed:\n {}'.format(traceback.format_exc()))
 
+    # Runs before each preview, OK is disabled and no preview is built while the inputs are invalid
+    def on_validate(self, command, inputs, args, input_values):
+
+        args.areInputsValid = validate_inputs(inputs, input_values)
+
     # Runs when the command is destroyed.  Sometimes useful for cleanup after the fact
     def on_destroy(self, command, inputs, reason_, input_values):
-        pass
+
+        if self.debounce_timer is not None:
+            self.debounce_timer.cancel()
+            self.debounce_timer = None
+
+        self.command = None
+        self.clear_preview_graphics()
+        self.build_cache.clear()
+        clear_ray_cache()
+
+        # Stage times of this command session
+        if debug_util.perf_enabled:
+            debug_util.write_perf_report()
+            debug_util.perf_reset()
+
+        if self.debounce_event is not None:
+            self.debounce_event.remove(self.debounce_handler)
+
+        self.debounce_event = None
+        self.debounce_handler = None
+
+        app = adsk.core.Application.get()
+        app.unregisterCustomEvent(DEBOUNCE_EVENT_ID)
 
     # Runs when when any input in the command dialog is changed
     def on_input_changed(self, command, inputs, changed_input, input_values):
 
+        # Used to collapse rapid changes into a single rebuild
+        self.last_change_time = time.perf_counter()
+
         # Update ui based on vent type selected
-        if changed_input.id == 'vent_type':
-            change_inputs(inputs, input_values['vent_type'])
+        if changed_input.id in ['vent_type', 'solve_area', 'extent_type']:
+            change_inputs(inputs, input_values['vent_type'], input_values['solve_area'], input_values['extent_type'])
+
+        # Solved inputs are written back here, so they do not trigger another solve
+        if input_values['solve_area'] and changed_input.id in SOLVER_INPUTS:
+            if not solve_flow_area(inputs, input_values):
+                return
+
+        update_flow_area(inputs, input_values)
 
-    # Runs when the user presses ok button (only defined here in preview)
+    # Runs when the user presses ok button
+    # Only called if the preview was not a valid result (deferred, debounced or editable sketch)
     def on_execute(self, command, inputs, args, input_values):
-        pass
+
+        self.clear_preview_graphics()
+
+        start_index = futil.start_group()
+
+        try:
+            build_vent(input_values, self.build_cache)
+
+            futil.end_group(start_index)
+
+        except Exception as e:
+            # Gets necessary application objects
+            app_objects = get_app_objects()
+
+            args.executeFailed = True
+
+            # Display error message
+            app_objects['ui'].messageBox('Sorry those inputs are invalid. \n \n' + str(e) + '\n \n Please Try Again')
 
     # Runs when user selects your command from Fusion UI, Build UI here
     def on_create(self, command, inputs):
@@ -397,6 +1713,16 @@ class VentMakerCommand(Fusion360CommandBase):
         # Gets necessary application objects
         app_objects = get_app_objects()
 
+        # Custom event used to trigger the debounced preview
+        app = app_objects['app']
+        # The handler is kept on the command object and removed in on_destroy, so handlers do not pile up
+        app.unregisterCustomEvent(DEBOUNCE_EVENT_ID)
+        self.debounce_event = app.registerCustomEvent(DEBOUNCE_EVENT_ID)
+        self.debounce_handler = DebouncePreviewHandler(self)
+        self.debounce_event.add(self.debounce_handler)
+
+        self.last_change_time = 0.0
+
         # Get users current units
         default_units = app_objects['units_manager'].defaultLengthUnits
 
@@ -406,10 +1732,33 @@ class VentMakerCommand(Fusion360CommandBase):
         vent_type_input.listItems.add('Circular', True)
         vent_type_input.listItems.add('Slot', False)
         vent_type_input.listItems.add('Rectangular', False)
+        vent_type_input.listItems.add('Hexagonal', False)
+        vent_type_input.listItems.add('Staggered', False)
 
-        center_input = inputs.addSelectionInput('center_point', 'Center of Vent: ', 'Select Sketch Point')
+        center_input = inputs.addSelectionInput('center_point', 'Center of Vent: ',
+                                                'Select Sketch Points or a Sketch')
         center_input.addSelectionFilter('SketchPoints')
-        center_input.setSelectionLimits(1, 1)
+        center_input.addSelectionFilter('Sketches')
+        center_input.setSelectionLimits(1, 0)
+
+        # End condition of the cut, only To Next needs a ray cast to find the opposite face
+        extent_type_input = inputs.addDropDownCommandInput('extent_type', 'Extent: ',
+                                                           adsk.core.DropDownStyles.TextListDropDownStyle)
+        extent_type_input.listItems.add('To Next', True)
+        extent_type_input.listItems.add('Blind', False)
+        extent_type_input.listItems.add('Through All', False)
+
+        inputs.addValueInput('extent_distance', 'Blind Distance', default_units,
+                             adsk.core.ValueInput.createByString('.1 in'))
+
+        # Only sketch the vent outline in preview, build the vent on OK
+        inputs.addBoolValueInput('defer_preview', 'Defer Preview', True, '', False)
+
+        # On OK cut the vent from a single tool body, the timeline does not grow with the number of openings
+        inputs.addBoolValueInput('compact_timeline', 'Compact Timeline', True, '', False)
+
+        # Draw the vents of all points on a face in one sketch and cut them with one extrude
+        inputs.addBoolValueInput('point_cloud', 'Point Cloud', True, '', False)
 
         # Rectangle and Slot inputs
         inputs.addValueInput('vent_width', 'Total width of vent area', default_units,
@@ -423,9 +1772,21 @@ class VentMakerCommand(Fusion360CommandBase):
         inputs.addValueInput('radius', 'Corner Radius (can be zero)', default_units,
                              adsk.core.ValueInput.createByString('.1 in'))
 
+        # Hexagonal and Staggered hole size, across flats for hexagons
+        inputs.addValueInput('hole_size', 'Hole Size', default_units,
+                             adsk.core.ValueInput.createByString('.25 in'))
+
         inputs.addIntegerSpinnerCommandInput('number_width', 'Number in Width: ', 1, 99, 1, 3)
         inputs.addIntegerSpinnerCommandInput('number_height', 'Number in Height: ', 1, 99, 1, 6)
 
+        # Method used to build the grid of openings
+        build_method_input = inputs.addDropDownCommandInput('build_method', 'Build Method: ',
+                                                            adsk.core.DropDownStyles.TextListDropDownStyle)
+        build_method_input.listItems.add('Pattern Feature', True)
+        build_method_input.listItems.add('Copy Bodies', False)
+        build_method_input.listItems.add('Sketch Profiles', False)
+        build_method_input.listItems.add('Incremental', False)
+
         # Hub and Spoke Vent
         inputs.addValueInput('vent_radius', 'Radius of vent area', default_units,
                              adsk.core.ValueInput.createByString('5 in'))
@@ -433,6 +1794,28 @@ class VentMakerCommand(Fusion360CommandBase):
         inputs.addIntegerSpinnerCommandInput('number_radial', 'Number of Hubs: ', 1, 99, 1, 3)
         inputs.addIntegerSpinnerCommandInput('number_axial', 'Number of Spokes: ', 1, 99, 1, 5)
 
-        inputs.addTextBoxCommandInput('flow_area', 'Total Air Flow Area (cm^2):', ' 0.0 ', 1, True)
+        # Cut the ribs from the vent boundary before touching the part
+        inputs.addBoolValueInput('single_combine', 'Single Combine', True, '', True)
+
+        # Constrain and dimension the spokes and hubs, slower but the sketch can be edited later
+        inputs.addBoolValueInput('editable_sketch', 'Editable Sketch', True, '', False)
+
+        # Solve the counts and border thickness for a required flow area
+        inputs.addBoolValueInput('solve_area', 'Solve for Flow Area', True, '', False)
+        inputs.addValueInput('target_area', 'Target Flow Area per Vent', default_units + '^2',
+                             adsk.core.ValueInput.createByString('20 in^2'))
+        inputs.addValueInput('min_border', 'Minimum Border Thickness', default_units,
+                             adsk.core.ValueInput.createByString('.05 in'))
+        inputs.addValueInput('max_opening', 'Maximum Opening Size', default_units,
+                             adsk.core.ValueInput.createByString('1 in'))
+
+        inputs.addTextBoxCommandInput('flow_area', 'Total Air Flow Area:', ' 0.0 ', 1, True)
+
+        # Problems with the current inputs, only visible while they are invalid
+        validation_input = inputs.addTextBoxCommandInput('validation_message', '', '', 3, True)
+        validation_input.isVisible = False
 
         change_inputs(inputs, vent_type_input.selectedItem.name)
+
+        # The flow area is otherwise only shown after the first input change
+        update_flow_area(inputs, get_inputs(inputs, self.input_ids))
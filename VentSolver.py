@@ -0,0 +1,228 @@
+"""
+Vent target area solver
+
+Chooses the opening counts and rib width that give a required flow area.
+Searches the closed form area of VentArea, no geometry is built and adsk is not imported.
+All lengths and areas are in the same units as the inputs (Fusion internal units are cm).
+"""
+
+import math
+
+from . import VentArea as varea
+
+# Largest count tried in each direction, matches the spinner limits of the command
+MAX_COUNT = 99
+
+# Bisection steps used to find the rib width, resolution is (max - min) / 2^steps
+BORDER_STEPS = 40
+
+# Most area evaluations in one solve, the solve gives up rather than blocking the dialog
+MAX_EVALUATIONS = 20000
+
+
+class _Budget:
+    """Counts the area evaluations of one solve"""
+
+    def __init__(self, area_function):
+        self.area_function = area_function
+        self.evaluations = 0
+
+    def area(self, *args):
+        self.evaluations += 1
+        return self.area_function(*args)
+
+    @property
+    def exhausted(self):
+        return self.evaluations >= MAX_EVALUATIONS
+
+
+def _solve_border(area_function, target_area, low_border, high_border):
+    """
+    Finds the rib width giving the target area, area_function must decrease as the width increases
+    The opening size limits are met by the range, any width in it is valid.
+    :return: The rib width or None if the target is larger than the area at low_border
+    """
+    if low_border >= high_border or area_function(low_border) < target_area:
+        return None
+
+    low = low_border
+    high = high_border
+
+    for step in range(BORDER_STEPS):
+        middle = (low + high) / 2.0
+
+        if area_function(middle) >= target_area:
+            low = middle
+        else:
+            high = middle
+
+    return low
+
+
+def _rectangle_border_range(vent_width, vent_height, number_width, number_height, min_border, max_opening, slot,
+                            radius):
+    """
+    Range of rib widths where no opening is larger than max_opening and the corner radius fits
+    Follows from VentLayout.rectangle_opening_size, the openings shrink as the width increases.
+    :return: Lowest and highest rib width, the range is empty if low is not below high
+    :rtype: tuple
+    """
+    low = max(min_border, (vent_width - number_width * max_opening) / (number_width + 1.0),
+              (vent_height - number_height * max_opening) / (number_height + 1.0))
+
+    # Openings must keep some size, a slot is a full radius on the smaller side
+    if slot:
+        opening = 0.0
+    else:
+        opening = 2 * radius
+
+    high = min((vent_width - number_width * opening) / (number_width + 1.0),
+               (vent_height - number_height * opening) / (number_height + 1.0))
+
+    return low, high
+
+
+def solve_rectangle_vent(vent_width, vent_height, target_area, min_border, max_opening, slot=False, radius=0.0):
+    """
+    Finds the fewest openings that give the target area in a rectangular or slot vent
+    For each count the rib width is solved to give the target area, the width must be at least min_border,
+    no opening may be larger than max_opening and the corner radius must fit in the openings.
+    Among equal counts the openings closest in shape to the vent are preferred.
+    Counts whose width range can not reach the target area are dropped before bisecting.
+    :param vent_width: Total width of the vent area
+    :type vent_width: float
+    :param vent_height: Total height of the vent area
+    :type vent_height: float
+    :param target_area: Required flow area
+    :type target_area: float
+    :param min_border: Minimum rib width
+    :type min_border: float
+    :param max_opening: Maximum width or height of an opening
+    :type max_opening: float
+    :param slot: Slot vent, corner radius is half the smaller opening side
+    :type slot: bool
+    :param radius: Corner radius of rectangular openings
+    :type radius: float
+    :return: The number_width, number_height and vent_border inputs and the resulting area, None if not possible
+    :rtype: dict
+    """
+    aspect = vent_width / vent_height
+
+    max_width = MAX_COUNT
+    max_height = MAX_COUNT
+
+    # More openings than this in a direction leave no room between the ribs
+    if min_border > 0:
+        max_width = min(max_width, int(vent_width / min_border))
+        max_height = min(max_height, int(vent_height / min_border))
+
+    counts = [(number_width, number_height) for number_width in range(1, max_width + 1)
+              for number_height in range(1, max_height + 1)]
+    counts.sort(key=lambda count: (count[0] * count[1], abs(math.log(count[0] / count[1] / aspect))))
+
+    budget = _Budget(varea.rectangle_vent_area)
+
+    for number_width, number_height in counts:
+        if budget.exhausted:
+            return None
+
+        low, high = _rectangle_border_range(vent_width, vent_height, number_width, number_height, min_border,
+                                            max_opening, slot, radius)
+
+        vent_border = _solve_border(lambda border: budget.area(vent_width, vent_height, border, number_width,
+                                                               number_height, slot, radius),
+                                    target_area, low, high)
+
+        if vent_border is None:
+            continue
+
+        return {'number_width': number_width, 'number_height': number_height, 'vent_border': vent_border,
+                'area': varea.rectangle_vent_area(vent_width, vent_height, vent_border, number_width,
+                                                  number_height, slot, radius)}
+
+    return None
+
+
+def solve_hub_spoke_vent(vent_radius, target_area, min_border, max_opening):
+    """
+    Finds the fewest spokes and hubs that give the target area in a circular vent
+    The rib width is solved to give the target area, it must be at least min_border.
+    The radial gap between hubs and the gap between spokes at the vent boundary must not exceed max_opening.
+    Counts that can not meet the gaps or the target area are dropped before bisecting.
+    :param vent_radius: Radius of the vent area
+    :type vent_radius: float
+    :param target_area: Required flow area
+    :type target_area: float
+    :param min_border: Minimum rib width
+    :type min_border: float
+    :param max_opening: Maximum size of an opening
+    :type max_opening: float
+    :return: The number_axial, number_radial and vent_border inputs and the resulting area, None if not possible
+    :rtype: dict
+    """
+    max_radial = MAX_COUNT
+    max_axial = MAX_COUNT
+
+    if min_border > 0:
+        # A hub pitch must be wider than the minimum rib
+        max_radial = min(max_radial, int(math.ceil(vent_radius / min_border)) - 1)
+
+        # With more spokes neighbouring ribs touch out to the boundary, see VentArea.hub_spoke_vent_area
+        max_axial = min(max_axial, int(math.pi / math.asin(min(1.0, min_border / 2 / vent_radius))))
+
+    counts = []
+
+    for number_radial in range(1, max_radial + 1):
+        hub_pitch = vent_radius / number_radial
+
+        # The spoke gap at the boundary less the widest possible rib must not exceed max_opening
+        min_axial = max(1, int(2 * math.pi * vent_radius / (hub_pitch + max_opening)))
+
+        counts.extend((number_axial, number_radial) for number_axial in range(min_axial, max_axial + 1))
+
+    counts.sort(key=lambda count: count[0] + count[1])
+
+    budget = _Budget(varea.hub_spoke_vent_area)
+
+    for number_axial, number_radial in counts:
+        if budget.exhausted:
+            return None
+
+        hub_pitch = vent_radius / number_radial
+        spoke_pitch = 2 * math.pi * vent_radius / number_axial
+
+        # Narrower ribs would leave a gap wider than max_opening
+        low = max(min_border, hub_pitch - max_opening, spoke_pitch - max_opening)
+
+        vent_border = _solve_border(lambda border: budget.area(vent_radius, border, number_axial, number_radial),
+                                    target_area, low, hub_pitch)
+
+        if vent_border is None:
+            continue
+
+        return {'number_axial': number_axial, 'number_radial': number_radial, 'vent_border': vent_border,
+                'area': varea.hub_spoke_vent_area(vent_radius, vent_border, number_axial, number_radial)}
+
+    return None
+
+
+def solve_vent(input_values):
+    """
+    Solves the vent for the target area in the command input values
+    :param input_values: Values from Fusion360CommandBase.get_inputs
+    :type input_values: dict
+    :return: Input values to apply and the resulting area, None if not possible or not supported by the vent type
+    :rtype: dict
+    """
+    vent_type = input_values['vent_type']
+
+    if vent_type not in ['Circular', 'Slot', 'Rectangular']:
+        return None
+
+    if vent_type == 'Circular':
+        return solve_hub_spoke_vent(input_values['vent_radius'], input_values['target_area'],
+                                    input_values['min_border'], input_values['max_opening'])
+
+    return solve_rectangle_vent(input_values['vent_width'], input_values['vent_height'],
+                                input_values['target_area'], input_values['min_border'],
+                                input_values['max_opening'], vent_type == 'Slot', input_values['radius'])
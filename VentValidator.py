@@ -0,0 +1,191 @@
+"""
+Vent input validation
+
+Checks the closed form layout constraints of a vent before any geometry is built.
+This module does not import adsk, so it runs inside Fusion 360 before a preview and in headless
+design automation scripts that screen large parameter sweeps.
+
+Headless use, with the add-in folder importable as the ventMaker package:
+
+    from ventMaker import VentValidator
+
+    results = VentValidator.validate_batch(configurations)
+    valid_configurations = [config for config, result in zip(configurations, results) if result.valid]
+
+Do not use a process pool inside Fusion 360, worker processes would start new copies of the application.
+"""
+
+import concurrent.futures
+import math
+import os
+from collections import namedtuple
+
+from . import VentLayout as vlayout
+
+# Result of validating one configuration, reasons is empty when valid
+ValidationResult = namedtuple('ValidationResult', ['valid', 'reasons'])
+
+# Batches smaller than this are validated in the calling process, starting workers would take longer
+MIN_POOL_BATCH = 2000
+
+# Configurations sent to a worker at a time
+POOL_CHUNK_SIZE = 500
+
+
+def _positive(reasons, input_values, names):
+    """Adds a reason for each named value that is not positive, returns True if all are positive"""
+    valid = True
+
+    for name in names:
+        if not input_values[name] > 0:
+            reasons.append('{} must be greater than zero'.format(name))
+            valid = False
+
+    return valid
+
+
+def _counts(reasons, input_values, names):
+    """Adds a reason for each named count below one, returns True if all are at least one"""
+    valid = True
+
+    for name in names:
+        if input_values[name] < 1 or int(input_values[name]) != input_values[name]:
+            reasons.append('{} must be a whole number of at least one'.format(name))
+            valid = False
+
+    return valid
+
+
+def _rectangle_reasons(input_values, reasons):
+    if not (_positive(reasons, input_values, ['vent_width', 'vent_height']) &
+            _counts(reasons, input_values, ['number_width', 'number_height'])):
+        return
+
+    # Openings without a border share edges and are merged into one profile
+    if not _positive(reasons, input_values, ['vent_border']):
+        return
+
+    rect_width, rect_height = vlayout.rectangle_opening_size(input_values['vent_width'], input_values['vent_height'],
+                                                             input_values['vent_border'],
+                                                             input_values['number_width'],
+                                                             input_values['number_height'])
+
+    if rect_width <= 0:
+        reasons.append('vent_border is too thick for {} openings in the width'.format(input_values['number_width']))
+
+    if rect_height <= 0:
+        reasons.append('vent_border is too thick for {} openings in the height'.format(
+            input_values['number_height']))
+
+    if input_values['vent_type'] == 'Slot' or rect_width <= 0 or rect_height <= 0:
+        return
+
+    radius = input_values['radius']
+
+    if radius < 0:
+        reasons.append('radius can not be negative')
+
+    # The fillets would leave no straight edge between them
+    elif 2 * radius >= min(rect_width, rect_height):
+        reasons.append('radius must be less than half of the smaller opening side ({:.4g})'.format(
+            min(rect_width, rect_height) / 2))
+
+
+def _hub_spoke_reasons(input_values, reasons):
+    if not (_positive(reasons, input_values, ['vent_radius', 'vent_border']) &
+            _counts(reasons, input_values, ['number_axial', 'number_radial'])):
+        return
+
+    vent_radius = input_values['vent_radius']
+    vent_border = input_values['vent_border']
+    number_axial = input_values['number_axial']
+
+    if vent_border >= vent_radius / input_values['number_radial']:
+        reasons.append('vent_border is too thick for {} hubs'.format(input_values['number_radial']))
+
+    # Neighbouring spokes touch inside this radius, see VentArea.hub_spoke_vent_area
+    if number_axial > 1 and vent_border / 2 / math.sin(math.pi / number_axial) >= vent_radius:
+        reasons.append('vent_border is too thick for {} spokes'.format(number_axial))
+
+
+def _perforated_reasons(input_values, reasons):
+    # Holes without a border between them touch and are merged into one profile
+    if not _positive(reasons, input_values, ['vent_width', 'vent_height', 'hole_size', 'vent_border']):
+        return
+
+    vent_border = input_values['vent_border']
+
+    hole_size = input_values['hole_size']
+
+    # Half height of a hexagon with a vertex at the top, see VentLayout.perforated_layout
+    if input_values['vent_type'] == 'Hexagonal':
+        half_height = hole_size / math.sqrt(3)
+    else:
+        half_height = hole_size / 2
+
+    # The center hole is the first to be placed, if it does not fit no hole does
+    if input_values['vent_width'] / 2 - vent_border < hole_size / 2 or \
+            input_values['vent_height'] / 2 - vent_border < half_height:
+        reasons.append('No holes fit in the vent area, reduce the hole size or border thickness')
+
+
+def validate_vent(input_values):
+    """
+    Checks one vent configuration against the layout constraints of its vent type
+    Only the closed form sizes are computed, openings are not placed.
+    :param input_values: Values as returned by Fusion360CommandBase.get_inputs, lengths in the same units
+    :type input_values: dict
+    :return: Whether the configuration can be built and the reasons if not
+    :rtype: ValidationResult
+    """
+    reasons = []
+
+    try:
+        vent_type = input_values['vent_type']
+
+        if vent_type in ['Rectangular', 'Slot']:
+            _rectangle_reasons(input_values, reasons)
+
+        elif vent_type == 'Circular':
+            _hub_spoke_reasons(input_values, reasons)
+
+        elif vent_type in ['Hexagonal', 'Staggered']:
+            _perforated_reasons(input_values, reasons)
+
+        else:
+            reasons.append('Unknown vent type {}'.format(vent_type))
+
+        if input_values.get('extent_type') == 'Blind' and not input_values['extent_distance'] > 0:
+            reasons.append('extent_distance must be greater than zero for a Blind extent')
+
+    except KeyError as e:
+        reasons.append('Missing input {}'.format(e))
+
+    except TypeError as e:
+        reasons.append('Invalid input value: {}'.format(e))
+
+    return ValidationResult(len(reasons) == 0, reasons)
+
+
+def validate_batch(configurations, processes=None, chunk_size=POOL_CHUNK_SIZE):
+    """
+    Checks many vent configurations, large batches are spread across a process pool
+    :param configurations: Input value dictionaries, see validate_vent
+    :type configurations: list
+    :param processes: Number of worker processes, None for one per CPU, 1 to validate in this process
+    :type processes: int
+    :param chunk_size: Configurations sent to a worker at a time
+    :type chunk_size: int
+    :return: A result for each configuration, in the same order
+    :rtype: list
+    """
+    configurations = list(configurations)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes == 1 or len(configurations) < MIN_POOL_BATCH:
+        return [validate_vent(input_values) for input_values in configurations]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(validate_vent, configurations, chunksize=chunk_size))
@@ -0,0 +1,315 @@
+"""
+API call benchmarks for Vent Maker
+
+Runs the vent builders against the recording adsk stand-in in fake_adsk and reports
+how many Fusion 360 API calls and timeline features each vent costs across grid sizes.
+
+Usage:
+    python benchmarks/bench_api_calls.py            Print the report
+    python benchmarks/bench_api_calls.py --check    Also fail if feature counts exceed the baseline
+                                                    or a single combine scenario cuts the part more than once
+    python benchmarks/bench_api_calls.py --update   Rewrite the baseline from the current counts
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDIN_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_FILE = os.path.join(BENCH_DIR, 'api_call_baseline.json')
+
+# Name the add-in is imported under, Fusion 360 loads it as a package
+ADDIN_PACKAGE = 'ventMaker'
+
+# Calls reported in their own column
+REPORT_CALLS = ['sketches.add', 'sketches.addWithoutEdges', 'extrudeFeatures.add', 'rectangularPatternFeatures.add',
+                'moveFeatures.add', 'BRepBody.copyToComponent', 'thickenFeatures.add', 'baseFeatures.add',
+                'combineFeatures.add', 'sketchDimensions.addAngularDimension', 'sketchDimensions.addRadialDimension']
+
+RECTANGLE_GRIDS = [(1, 1), (3, 6), (10, 10), (20, 40)]
+HUB_SPOKE_GRIDS = [(5, 3), (12, 8), (24, 16), (48, 32)]
+PATTERN_GRIDS = [(2, 2), (10, 10), (20, 40)]
+MULTI_POINT_COUNTS = [1, 10, 30]
+FACE_EDGE_COUNTS = [4, 100, 1000]
+
+# Scenarios that must cut the part with exactly one combine, whatever the number of vents
+SINGLE_COMBINE_SCENARIOS = ['create_hub_spoke_vent[constrained]', 'create_hub_spoke_vent[unconstrained]',
+                            'build_vent[Circular 12x8, multiple points]', 'build_vent[Circular, compact timeline]']
+PERFORATED_HOLE_SIZES = [2.0, .5, .2]
+
+
+def load_addin():
+    """Imports the add-in modules against the fake adsk package"""
+    sys.path.insert(0, os.path.join(BENCH_DIR, 'fake_adsk'))
+
+    import adsk
+
+    package = types.ModuleType(ADDIN_PACKAGE)
+    package.__path__ = [ADDIN_DIR]
+    sys.modules[ADDIN_PACKAGE] = package
+
+    vent_command = importlib.import_module(ADDIN_PACKAGE + '.VentMakerCommand')
+    utilities = importlib.import_module(ADDIN_PACKAGE + '.Fusion360Utilities.Fusion360Utilities')
+
+    # Every run starts without cached ray casts
+    adsk.reset_callbacks.append(vent_command.clear_ray_cache)
+
+    return adsk, vent_command, utilities
+
+
+def point_cloud_point(adsk, index):
+    """Sketch point at a distinct position, fake points are all at the origin otherwise"""
+    world_point = adsk.FakeObject('Point3D')
+    world_point.__dict__['x'] = 30.0 * index
+
+    sketch_point = adsk.FakeObject('SketchPoint')
+    sketch_point.__dict__['worldGeometry'] = world_point
+    return sketch_point
+
+
+def feature_count(calls):
+    """Number of timeline entries, sketches and features, left by the recorded calls"""
+    created = sum(count for key, count in calls.items() if key in ['sketches.add', 'sketches.addWithoutEdges'] or
+                  (key.endswith('Features.add') and not key.startswith('ObjectCollection')))
+
+    # Sketches only created to read their axes are deleted again
+    return created - calls.get('Sketch.deleteMe', 0)
+
+
+def measure(adsk, function, *args, edge_count=4):
+    adsk.reset(edge_count)
+    function(*args)
+    calls = dict(adsk.calls)
+
+    result = {key: calls.get(key, 0) for key in REPORT_CALLS}
+    result['features'] = feature_count(calls)
+    result['api_calls'] = sum(calls.values())
+    result['target_body_combines'] = adsk.target_body_combines
+    return result
+
+
+def run_scenarios(adsk, vent_command, utilities):
+    """Runs every scenario and returns {scenario name: [(openings, result), ...]}"""
+    scenarios = {}
+    center_point = adsk.FakeObject('SketchPoint')
+
+    for build_method in ['Pattern Feature', 'Copy Bodies', 'Sketch Profiles', 'Incremental']:
+        name = 'rectangle_vents[{}]'.format(build_method)
+        scenarios[name] = []
+
+        for number_width, number_height in RECTANGLE_GRIDS:
+            result = measure(adsk, vent_command.rectangle_vents, 25.4, 10.16, .254, number_width, number_height,
+                             center_point, False, .254, build_method)
+            scenarios[name].append((number_width * number_height, result))
+
+    # Rebuild with unchanged inputs, only the base feature and combine are created
+    name = 'rectangle_vents[Incremental, warm cache]'
+    scenarios[name] = []
+
+    for number_width, number_height in RECTANGLE_GRIDS:
+        build_cache = utilities.StageCache()
+        vent_command.rectangle_vents(25.4, 10.16, .254, number_width, number_height, center_point, False, .254,
+                                     'Incremental', build_cache)
+        result = measure(adsk, vent_command.rectangle_vents, 25.4, 10.16, .254, number_width, number_height,
+                         center_point, False, .254, 'Incremental', build_cache)
+        scenarios[name].append((number_width * number_height, result))
+
+    # Several center points on one body from a single command run
+    name = 'build_vent[Rectangular 3x6, multiple points]'
+    scenarios[name] = []
+
+    for point_count in MULTI_POINT_COUNTS:
+        input_values = {'vent_type': 'Rectangular', 'vent_width': 25.4, 'vent_height': 10.16, 'vent_border': .254,
+                        'number_width': 3, 'number_height': 6, 'radius': .254, 'build_method': 'Pattern Feature',
+                        'extent_type': 'To Next', 'extent_distance': 0.0, 'compact_timeline': False,
+                        'point_cloud': False,
+                        'center_point': [adsk.FakeObject('SketchPoint') for _ in range(point_count)]}
+        result = measure(adsk, vent_command.build_vent, input_values)
+        scenarios[name].append((18 * point_count, result))
+
+    # Same points with one sketch and extrude per face
+    name = 'build_vent[Rectangular 3x6, point cloud]'
+    scenarios[name] = []
+
+    for point_count in MULTI_POINT_COUNTS:
+        input_values = {'vent_type': 'Rectangular', 'vent_width': 25.4, 'vent_height': 10.16, 'vent_border': .254,
+                        'number_width': 3, 'number_height': 6, 'radius': .254, 'build_method': 'Pattern Feature',
+                        'extent_type': 'To Next', 'extent_distance': 0.0, 'compact_timeline': False,
+                        'point_cloud': True, 'center_point': [point_cloud_point(adsk, index)
+                                                              for index in range(point_count)]}
+        result = measure(adsk, vent_command.build_vent, input_values)
+        scenarios[name].append((18 * point_count, result))
+
+    for constrained in [True, False]:
+        name = 'create_hub_spoke_vent[{}]'.format('constrained' if constrained else 'unconstrained')
+        scenarios[name] = []
+
+        for number_axial, number_radial in HUB_SPOKE_GRIDS:
+            result = measure(adsk, vent_command.create_hub_spoke_vent, 12.7, .254, number_axial, number_radial,
+                             center_point, True, constrained)
+            scenarios[name].append((number_axial + number_radial, result))
+
+    # Several circular vents on one face, drawn in one shared sketch
+    name = 'build_vent[Circular 12x8, multiple points]'
+    scenarios[name] = []
+
+    for point_count in MULTI_POINT_COUNTS:
+        input_values = {'vent_type': 'Circular', 'vent_radius': 12.7, 'vent_border': .254,
+                        'number_axial': 12, 'number_radial': 8, 'single_combine': True,
+                        'editable_sketch': False, 'extent_type': 'To Next', 'extent_distance': 0.0,
+                        'compact_timeline': False, 'point_cloud': False,
+                        'center_point': [point_cloud_point(adsk, index) for index in range(point_count)]}
+        result = measure(adsk, vent_command.build_vent, input_values)
+        scenarios[name].append((20 * point_count, result))
+
+    # Committed with the compact timeline option, one base feature and one combine
+    name = 'build_vent[Circular, compact timeline]'
+    scenarios[name] = []
+
+    for number_axial, number_radial in HUB_SPOKE_GRIDS:
+        input_values = {'vent_type': 'Circular', 'vent_radius': 12.7, 'vent_border': .254,
+                        'number_axial': number_axial, 'number_radial': number_radial, 'single_combine': True,
+                        'editable_sketch': False, 'extent_type': 'To Next', 'extent_distance': 0.0,
+                        'compact_timeline': True, 'point_cloud': False, 'center_point': [center_point]}
+        result = measure(adsk, vent_command.build_vent, input_values)
+        scenarios[name].append((number_axial + number_radial, result))
+
+    for hex_holes in [True, False]:
+        name = 'perforated_vents[{}]'.format('Hexagonal' if hex_holes else 'Staggered')
+        scenarios[name] = []
+
+        for hole_size in PERFORATED_HOLE_SIZES:
+            holes = len(vent_command.vlayout.perforated_layout(25.4, 10.16, .1, hole_size, hex_holes).centers_x)
+            result = measure(adsk, vent_command.perforated_vents, 25.4, 10.16, .1, hole_size, center_point,
+                             hex_holes)
+            scenarios[name].append((holes, result))
+
+    # Outline preview of large grids, custom graphics only
+    name = 'preview_vent_graphics[Rectangular]'
+    scenarios[name] = []
+
+    for number_width, number_height in RECTANGLE_GRIDS:
+        input_values = {'vent_type': 'Rectangular', 'vent_width': 25.4, 'vent_height': 10.16, 'vent_border': .254,
+                        'number_width': number_width, 'number_height': number_height, 'center_point': [center_point]}
+        result = measure(adsk, vent_command.preview_vent_graphics, input_values)
+        scenarios[name].append((number_width * number_height, result))
+
+    # Sketch on a face with many edges, openings here is the number of face edges
+    name = 'create_vent_sketch[face edges]'
+    scenarios[name] = []
+
+    for edge_count in FACE_EDGE_COUNTS:
+        result = measure(adsk, vent_command.create_vent_sketch, center_point, edge_count=edge_count)
+        scenarios[name].append((edge_count, result))
+
+    scenarios['rect_body_pattern'] = []
+
+    for x_qty, y_qty in PATTERN_GRIDS:
+        bodies = [adsk.FakeObject('BRepBody')]
+        result = measure(adsk, utilities.rect_body_pattern, adsk.FakeObject('Component'), bodies,
+                         adsk.FakeObject('Vector3D'), adsk.FakeObject('Vector3D'), x_qty, 1.0, y_qty, 1.0)
+        scenarios['rect_body_pattern'].append((x_qty * y_qty, result))
+
+    return scenarios
+
+
+def scaling_exponent(points, key):
+    """Log-log slope of a count against the number of openings between the smallest and largest run"""
+    (n_0, result_0), (n_1, result_1) = points[0], points[-1]
+
+    if n_1 == n_0 or result_0[key] <= 0 or result_1[key] <= 0:
+        return 0.0
+
+    return math.log(result_1[key] / result_0[key]) / math.log(n_1 / n_0)
+
+
+def print_report(scenarios):
+    columns = REPORT_CALLS + ['features', 'api_calls']
+    header = '{:>9}'.format('openings') + ''.join('{:>{}}'.format(column, len(column) + 2) for column in columns) + \
+        '{:>16}'.format('calls/opening')
+
+    for name, points in scenarios.items():
+        print(name)
+        print(header)
+
+        for openings, result in points:
+            row = '{:>9}'.format(openings)
+            row += ''.join('{:>{}}'.format(result[column], len(column) + 2) for column in columns)
+            row += '{:>16.1f}'.format(result['api_calls'] / openings)
+            print(row)
+
+        print('scaling exponent: features {:.2f}, api calls {:.2f}\n'.format(
+            scaling_exponent(points, 'features'), scaling_exponent(points, 'api_calls')))
+
+
+def to_baseline(scenarios):
+    return {name: {str(openings): result['features'] for openings, result in points}
+            for name, points in scenarios.items()}
+
+
+def check_baseline(scenarios):
+    """Returns a list of feature count regressions against the stored baseline"""
+    with open(BASELINE_FILE) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    failures = []
+
+    for name, counts in to_baseline(scenarios).items():
+        for openings, features in counts.items():
+            expected = baseline.get(name, {}).get(openings)
+
+            if expected is not None and features > expected:
+                failures.append('{} with {} openings: {} features, baseline {}'.format(
+                    name, openings, features, expected))
+
+    return failures
+
+
+def check_single_combines(scenarios):
+    """Returns a list of single combine scenarios that did not cut the part exactly once"""
+    failures = []
+
+    for name in SINGLE_COMBINE_SCENARIOS:
+        for openings, result in scenarios[name]:
+            if result['target_body_combines'] != 1:
+                failures.append('{} with {} openings: {} combines on the part, expected 1'.format(
+                    name, openings, result['target_body_combines']))
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count Fusion 360 API calls per vent')
+    parser.add_argument('--check', action='store_true', help='Fail if feature counts exceed the baseline')
+    parser.add_argument('--update', action='store_true', help='Rewrite the baseline')
+    args = parser.parse_args()
+
+    adsk, vent_command, utilities = load_addin()
+    scenarios = run_scenarios(adsk, vent_command, utilities)
+
+    print_report(scenarios)
+
+    if args.update:
+        with open(BASELINE_FILE, 'w') as baseline_file:
+            json.dump(to_baseline(scenarios), baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+
+    if args.check:
+        failures = check_baseline(scenarios) + check_single_combines(scenarios)
+
+        for failure in failures:
+            print('REGRESSION: ' + failure)
+
+        if failures:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""
+Recording stand-in for the Fusion 360 adsk package
+
+Lets the add-in run outside of Fusion 360 so the benchmarks can count the API calls a vent costs.
+Never put this directory on the path inside Fusion 360, it would shadow the real API.
+
+Every method call and property write is counted in adsk.calls keyed as 'Owner.member',
+for example 'sketches.add', 'extrudeFeatures.add' or 'SketchCurve.isConstruction='.
+No geometry is computed, return values are placeholders shaped like the real API results.
+"""
+
+import collections
+import itertools
+
+# Counts of every recorded API call
+calls = collections.Counter()
+
+# Number of edges projected when a sketch is created on a face with sketches.add
+face_edge_count = 4
+
+_temp_ids = itertools.count(1)
+
+# Functions called by reset, used to clear add-in caches between runs
+reset_callbacks = []
+
+# Number of combine features whose target is target_body, the part every vent is cut from
+target_body_combines = 0
+
+
+def reset(edge_count=4):
+    """
+    Clears the recorded calls
+    :param edge_count: Number of edges on the faces vents are sketched on
+    :type edge_count: int
+    """
+    global face_edge_count, target_body_combines
+
+    calls.clear()
+    face_edge_count = edge_count
+    target_body_combines = 0
+
+    for callback in reset_callbacks:
+        callback()
+
+
+def record(key):
+    calls[key] += 1
+
+
+class ObjectCollection:
+    """Working copy of adsk.core.ObjectCollection"""
+
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @staticmethod
+    def create():
+        record('ObjectCollection.create')
+        return ObjectCollection()
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    @property
+    def objectType(self):
+        return 'adsk::core::ObjectCollection'
+
+    def add(self, item):
+        record('ObjectCollection.add')
+        if self.contains(item):
+            return False
+        self._items.append(item)
+        return True
+
+    def item(self, index):
+        return self._items[index]
+
+    def contains(self, item):
+        return any(existing is item for existing in self._items)
+
+    def find(self, item, start_index=0):
+        for index in range(start_index, len(self._items)):
+            if self._items[index] is item:
+                return index
+        return -1
+
+    def removeByItem(self, item):
+        index = self.find(item)
+        if index < 0:
+            return False
+        del self._items[index]
+        return True
+
+    def clear(self):
+        self._items = []
+        return True
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Type of the items returned when iterating or indexing a collection property
+ITEM_TYPES = {
+    'sketchCurves': 'SketchCurve',
+    'profiles': 'Profile',
+    'bodies': 'BRepBody',
+    'faces': 'BRepFace',
+    'endFaces': 'BRepFace',
+    'SketchLineList': 'SketchLine',
+}
+
+# Type of the object returned by a call, keyed by 'owner.method' or just 'method'
+RETURN_TYPES = {
+    'sketches.add': 'Sketch',
+    'addCenterPointRectangle': 'SketchLineList',
+    'addByTwoPoints': 'SketchLine',
+    'addByCenterRadius': 'SketchCircle',
+    'addFillet': 'SketchArc',
+    'copyToComponent': 'BRepBody',
+    'areaProperties': 'AreaProperties',
+    'createInput': 'FeatureInput',
+}
+
+# Closed sketch geometry that adds a profile to its sketch
+PROFILE_METHODS = ['addCenterPointRectangle', 'addByCenterRadius', 'addTwoPointRectangle', 'addScribedPolygon']
+
+
+class FakeObject:
+    """
+    Placeholder for any API object
+    Unknown properties return new placeholders, calling a placeholder records the call.
+    """
+
+    def __init__(self, name, parent=None, size=1):
+        self.__dict__['_name'] = name
+        self.__dict__['_parent'] = parent
+        self.__dict__['_size'] = size
+        self.__dict__['_items'] = []
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        if name in ['x', 'y', 'z', 'area', 'value']:
+            value = 0.0
+        elif name == 'tempId':
+            value = next(_temp_ids)
+        elif name == 'isValid':
+            value = True
+        elif name == 'count':
+            return self._size
+        elif name == 'objectType':
+            return 'adsk::fusion::' + self._name
+        elif name == 'sketchCurves':
+            value = FakeObject(name, self, face_edge_count)
+        elif name in ['profiles']:
+            value = FakeObject(name, self, 0)
+        else:
+            value = FakeObject(name, self)
+
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        record(self._name + '.' + name + '=')
+        self.__dict__[name] = value
+
+    def __call__(self, *args, **kwargs):
+        owner = self._parent
+        owner_name = owner._name if owner is not None else ''
+        key = owner_name + '.' + self._name
+        record(key)
+        return _call_result(owner, self._name, key, args)
+
+    def _item(self, index):
+        items = self._items
+        item_type = ITEM_TYPES.get(self._name, 'Object')
+
+        while len(items) < self._size:
+            items.append(FakeObject(item_type, self))
+
+        return items[index]
+
+    def item(self, index):
+        return self._item(index)
+
+    def __getitem__(self, index):
+        if index >= self._size or index < -self._size:
+            raise IndexError(index)
+        return self._item(index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._item(index)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return '<fake {}>'.format(self._name)
+
+
+# Every point lies on this face of this body, as if all vents were on one side of a part
+target_body = FakeObject('BRepBody')
+target_face = FakeObject('BRepFace')
+target_face.__dict__['body'] = target_body
+
+# Every ray cast from the target face ends on this face
+opposite_face = FakeObject('BRepFace')
+opposite_face.__dict__['body'] = target_body
+
+
+application = FakeObject('Application')
+
+
+def _sketch_of(entity):
+    while entity is not None and entity._name != 'Sketch':
+        entity = entity._parent
+    return entity
+
+
+def _collection_size(entities):
+    if isinstance(entities, ObjectCollection):
+        return entities.count
+    return 1
+
+
+def _call_result(owner, method, key, args):
+    result_type = RETURN_TYPES.get(key, RETURN_TYPES.get(method, 'Object'))
+
+    if method == 'cast':
+        return args[0]
+
+    # The running application is a single object
+    if method == 'get' and owner._name == 'Application':
+        return application
+
+    if method == 'classType':
+        return 'adsk::core::' + owner._name
+
+    if method == 'createByReal':
+        value_input = FakeObject('ValueInput')
+        value_input.__dict__['realValue'] = args[0]
+        return value_input
+
+    if method == 'distanceTo':
+        return 1.0
+
+    if method == 'getNormalAtPoint':
+        return True, FakeObject('Vector3D')
+
+    if method == 'findBRepUsingPoint':
+        return ObjectCollection([target_face])
+
+    if method == 'findBRepUsingRay':
+        if len(args) > 5 and isinstance(args[5], ObjectCollection):
+            args[5].add(FakeObject('Point3D'))
+            args[5].add(FakeObject('Point3D'))
+        return ObjectCollection([target_face, opposite_face])
+
+    if method == 'addWithoutEdges':
+        sketch = FakeObject('Sketch', owner)
+        sketch.__dict__['sketchCurves'] = FakeObject('sketchCurves', sketch, 0)
+        sketch.__dict__['referencePlane'] = args[0]
+        return sketch
+
+    if key == 'sketches.add':
+        sketch = FakeObject('Sketch', owner)
+        sketch.__dict__['referencePlane'] = args[0]
+        return sketch
+
+    if method == 'project':
+        return ObjectCollection([FakeObject('SketchPoint')])
+
+    if method in PROFILE_METHODS:
+        sketch = _sketch_of(owner)
+        if sketch is not None:
+            sketch.profiles.__dict__['_size'] += 1
+
+    if method == 'addCenterPointRectangle':
+        return FakeObject(result_type, owner, 4)
+
+    if method == 'createInput':
+        feature_input = FakeObject(owner._name + 'Input', owner)
+        feature_input.__dict__['_size'] = _collection_size(args[0]) if args else 1
+        feature_input.__dict__['_args'] = args
+        return feature_input
+
+    if method == 'setDirectionTwo':
+        owner.__dict__['_direction_two'] = args
+        return True
+
+    if method == 'add' and owner._name.endswith('Features'):
+        return _add_feature(owner, args[0] if args else None)
+
+    return FakeObject(result_type, owner)
+
+
+def _add_feature(features, feature_input):
+    global target_body_combines
+
+    feature = FakeObject(features._name[:-1], features)
+
+    if features._name == 'combineFeatures' and feature_input._args[0] is target_body:
+        target_body_combines += 1
+    input_size = getattr(feature_input, '_size', 1)
+
+    if features._name == 'rectangularPatternFeatures':
+        quantity = feature_input._args[2].realValue
+        direction_two = feature_input.__dict__.get('_direction_two')
+        if direction_two is not None:
+            quantity *= direction_two[1].realValue
+        body_count = input_size * (int(quantity) - 1)
+
+    elif features._name == 'thickenFeatures':
+        body_count = input_size
+
+    elif features._name == 'moveFeatures':
+        body_count = 0
+
+    else:
+        body_count = 1
+
+    feature.__dict__['bodies'] = FakeObject('bodies', feature, body_count)
+    feature.__dict__['faces'] = FakeObject('faces', feature, input_size)
+    feature.__dict__['endFaces'] = FakeObject('endFaces', feature, 1)
+    return feature
+
+
+class FakeModule:
+    """Builds module level attributes such as adsk.core.Point3D on first access"""
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.members = {}
+
+    def __call__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        if name not in self.members:
+            if name == 'ObjectCollection':
+                self.members[name] = ObjectCollection
+            elif name.endswith('Handler'):
+                self.members[name] = type(name, (_EventHandler,), {})
+            else:
+                self.members[name] = FakeObject(name)
+
+        return self.members[name]
+
+
+class _EventHandler:
+    def __init__(self):
+        pass
+
+    def notify(self, args):
+        pass
@@ -0,0 +1,5 @@
+"""Recording stand-in for adsk.fusion, see the adsk package docstring"""
+
+from . import FakeModule
+
+__getattr__ = FakeModule('fusion')
@@ -0,0 +1,73 @@
+"""
+Tests for the vent input validation
+
+VentValidator does not import adsk, so these run without Fusion 360. From the add-in folder:
+
+    python -m unittest discover tests
+"""
+
+import importlib
+import os
+import sys
+import types
+import unittest
+
+ADDIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Name the add-in is imported under, Fusion 360 loads it as a package
+ADDIN_PACKAGE = 'ventMaker'
+
+
+def load_validator():
+    """Imports VentValidator as part of the add-in package"""
+    if ADDIN_PACKAGE not in sys.modules:
+        package = types.ModuleType(ADDIN_PACKAGE)
+        package.__path__ = [ADDIN_DIR]
+        sys.modules[ADDIN_PACKAGE] = package
+
+    return importlib.import_module(ADDIN_PACKAGE + '.VentValidator')
+
+
+vvalidator = load_validator()
+
+RECTANGULAR = {'vent_type': 'Rectangular', 'vent_width': 25.4, 'vent_height': 10.16, 'vent_border': .254,
+               'number_width': 3, 'number_height': 6, 'radius': .254, 'extent_type': 'To Next'}
+
+PERFORATED = {'vent_type': 'Hexagonal', 'vent_width': 25.4, 'vent_height': 10.16, 'vent_border': .254,
+              'hole_size': .635, 'extent_type': 'To Next'}
+
+
+class RectangleBorderTest(unittest.TestCase):
+
+    def test_positive_border_is_valid(self):
+        for vent_type in ['Rectangular', 'Slot']:
+            result = vvalidator.validate_vent(dict(RECTANGULAR, vent_type=vent_type))
+            self.assertTrue(result.valid, result.reasons)
+
+    def test_zero_border_is_invalid(self):
+        for vent_type in ['Rectangular', 'Slot']:
+            result = vvalidator.validate_vent(dict(RECTANGULAR, vent_type=vent_type, vent_border=0.0))
+            self.assertFalse(result.valid)
+            self.assertIn('vent_border must be greater than zero', result.reasons)
+
+    def test_negative_border_is_invalid(self):
+        result = vvalidator.validate_vent(dict(RECTANGULAR, vent_border=-.1))
+        self.assertFalse(result.valid)
+
+
+class PerforatedBorderTest(unittest.TestCase):
+
+    def test_positive_border_is_valid(self):
+        for vent_type in ['Hexagonal', 'Staggered']:
+            result = vvalidator.validate_vent(dict(PERFORATED, vent_type=vent_type))
+            self.assertTrue(result.valid, result.reasons)
+
+    def test_zero_border_is_invalid(self):
+        for vent_type in ['Hexagonal', 'Staggered']:
+            result = vvalidator.validate_vent(dict(PERFORATED, vent_type=vent_type, vent_border=0.0))
+            self.assertFalse(result.valid)
+            self.assertIn('vent_border must be greater than zero', result.reasons)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 # Importing sample Fusion Command
 # Could import multiple Command definitions here
 from .VentMakerCommand import VentMakerCommand
+from .Fusion360Utilities import Fusion360DebugUtilities
 
 commands = []
 command_definitions = []
@@ -13,13 +14,23 @@ cmd = {
     'cmd_id': 'cmdID_ventMaker',
     'workspace': 'FusionSolidEnvironment',
     'toolbar_panel_id': 'SolidScriptsAddinsPanel',
-    'class': VentMakerCommand
+    'class': VentMakerCommand,
+
+    # Only these inputs are read on each event, the flow area and validation text boxes are skipped
+    'input_ids': ['center_point', 'vent_type', 'extent_type', 'extent_distance', 'defer_preview', 'compact_timeline',
+                  'point_cloud', 'vent_width', 'vent_height', 'vent_border', 'radius', 'hole_size', 'number_width',
+                  'number_height', 'build_method', 'vent_radius', 'number_radial', 'number_axial', 'single_combine',
+                  'editable_sketch', 'solve_area', 'target_area', 'min_border', 'max_opening']
 }
 command_definitions.append(cmd)
 
 # Set to True to display various useful messages when debugging your app
 debug = False
 
+# Set to True to log the time spent in each vent build stage to ~/Fusion360DebugUtilities
+profile = False
+Fusion360DebugUtilities.set_perf_enabled(profile)
+
 # Don't change anything below here:
 for cmd_def in command_definitions:
     command = cmd_def['class'](cmd_def, debug)